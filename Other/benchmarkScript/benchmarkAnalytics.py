@@ -0,0 +1,144 @@
+"""
+Latency and throughput of the reference statements: MySQL vs embedded SQLite.
+
+    python Other/benchmarkScript/benchmarkAnalytics.py                 # export, then 200 runs each
+    python Other/benchmarkScript/benchmarkAnalytics.py -n 1000 --threads 4
+
+Connection settings come from the same MYSQL_* variables the app uses.
+The current data is exported to SQLite first (analytics.build). Every
+statement in queries.py with a ``ttl`` then runs ``-n`` times on each
+backend, bypassing the query cache, with the sample arguments the
+EXPLAIN harness uses. MySQL runs as the app does: prepared statements
+on pooled connections. For each statement the script prints the median
+and 95th percentile latency in ms, plus the throughput of ``--threads``
+callers running concurrently.
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+import threading
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "Other", "explainScript"))
+
+import sqlite3  # noqa: E402
+from db import get_db  # noqa: E402
+import queries  # noqa: E402
+import analytics  # noqa: E402
+from explainPlans import sample_params  # noqa: E402
+
+
+# Each backend is a factory: calling it opens a connection for the
+# calling thread and returns (run, close).
+
+def _mysql(stmt, params):
+    def connect():
+        conn = get_db()
+        cur = conn.cursor(prepared=True)
+
+        def run():
+            cur.execute(stmt.sql, params)
+            return cur.fetchall()
+
+        def close():
+            cur.close()
+            conn.close()
+        return run, close
+    return connect
+
+
+def _sqlite(path, sql, params):
+    def connect():
+        conn = sqlite3.connect(
+            f"file:{path}?mode=ro&immutable=1", uri=True,
+            detect_types=sqlite3.PARSE_DECLTYPES
+        )
+        return (lambda: conn.execute(sql, params).fetchall()), conn.close
+    return connect
+
+
+def latency(connect, n):
+    run, close = connect()
+    try:
+        run()   # prepare / warm the page cache
+        times = []
+        for _ in range(n):
+            start = time.perf_counter()
+            run()
+            times.append((time.perf_counter() - start) * 1000)
+    finally:
+        close()
+    times.sort()
+    return statistics.median(times), times[max(0, int(len(times) * 0.95) - 1)]
+
+
+def throughput(connect, n, threads):
+    def work():
+        run, close = connect()
+        try:
+            for _ in range(n):
+                run()
+        finally:
+            close()
+    workers = [threading.Thread(target=work) for _ in range(threads)]
+    start = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return n * threads / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("-n", type=int, default=200, help="runs per statement and backend")
+    parser.add_argument("--threads", type=int, default=4, help="concurrent callers for throughput")
+    parser.add_argument("--no-export", action="store_true",
+                        help="reuse the newest SQLite file in ANALYTICS_DIR")
+    args = parser.parse_args()
+
+    if args.no_export:
+        files = sorted(
+            (f for f in os.listdir(analytics.ANALYTICS_DIR) if f.endswith(".sqlite")),
+            key=lambda f: int(f[:-7])
+        )
+        path = os.path.join(analytics.ANALYTICS_DIR, files[-1])
+    else:
+        path = analytics.build()
+    print(f"SQLite file: {path} ({os.path.getsize(path) / 1024:.0f} KB)")
+
+    conn = get_db()
+    cur = conn.cursor()
+    print(f"{'statement':32} {'mysql p50':>10} {'p95':>8} {'q/s':>8}"
+          f" {'sqlite p50':>11} {'p95':>8} {'q/s':>8}")
+    totals = {"mysql": 0.0, "sqlite": 0.0}
+    for name, stmt in sorted(queries.STATEMENTS.items()):
+        if not stmt.ttl:
+            continue
+        params = sample_params(cur, name)
+        if params is None:
+            print(f"skip {name}: no sample data")
+            continue
+        params = params + stmt.bound
+        line = f"{name:32}"
+        for backend, connect in (
+            ("mysql", _mysql(stmt, params)),
+            ("sqlite", _sqlite(path, analytics.sql_for(name, stmt), params)),
+        ):
+            p50, p95 = latency(connect, args.n)
+            qps = throughput(connect, args.n, args.threads)
+            totals[backend] += p50
+            width = 10 if backend == "mysql" else 11
+            line += f" {p50:{width}.3f} {p95:8.3f} {qps:8.0f}"
+        print(line)
+    cur.close()
+    conn.close()
+    print(f"Sum of medians: mysql {totals['mysql']:.2f} ms, sqlite {totals['sqlite']:.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,228 @@
+"""
+EXPLAIN-plan regression harness for every SELECT in queries.py.
+
+    python Other/explainScript/explainPlans.py --load      # import theDump and migrate it first
+    python Other/explainScript/explainPlans.py --update    # record a new baseline
+    python Other/explainScript/explainPlans.py             # compare to the baseline
+    python Other/explainScript/explainPlans.py --analyze   # also print EXPLAIN ANALYZE
+
+Connection settings come from the same MYSQL_* variables the app uses.
+For each statement we record, per table, the access type, the key used
+and rows examined per scan, plus whether the plan needs a filesort or a
+temporary table. The run fails (exit code 1) when a table that used an
+index in the baseline is now read with a full scan (access type ALL) or
+examines many times more rows, and when there is no baseline to compare
+to; new filesorts/temporaries are reported as warnings. The baseline,
+explain_baseline.json next to this script, is committed.
+"""
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, ROOT)
+
+from db import get_db  # noqa: E402
+import queries  # noqa: E402
+import migrate  # noqa: E402
+
+DUMP = os.path.join(ROOT, "theDump", "theOscars_dump.sql")
+BASELINE = os.path.join(os.path.dirname(__file__), "explain_baseline.json")
+
+# A table "regresses" when it examines this many times more rows than
+# in the baseline (and at least MIN_ROWS rows).
+ROWS_FACTOR = 2.0
+MIN_ROWS = 100
+
+# Each parameterised statement gets its sample arguments from a lookup
+# query, so the harness keeps working whatever ends up in the dump.
+SAMPLE_PARAMS = {
+    "user_taken": "SELECT username, email FROM Users LIMIT 1",
+    "user_exists": "SELECT username FROM Users LIMIT 1",
+    "user_nominations": "SELECT userUsername FROM UserNomination LIMIT 1",
+    "top_nominated_categories": "SELECT season FROM UserNomination LIMIT 1",
+    "top_nominated_years": "SELECT season FROM UserNomination LIMIT 1",
+    "top_nominated_by_category":
+        "SELECT season, categoryId FROM UserNomination LIMIT 1",
+    "top_nominated_by_year":
+        "SELECT season, releaseYear FROM UserNomination LIMIT 1",
+    "staff_by_country": """
+        SELECT countryOfBirthId FROM Person
+        WHERE countryOfBirthId IS NOT NULL
+        GROUP BY countryOfBirthId ORDER BY COUNT(*) DESC LIMIT 1
+    """,
+    "stats_role": "SELECT 'actor'",
+    "stats_persons": "SELECT 'actor'",
+    "stats_totals": """
+        SELECT an.personId, r.statsRole
+        FROM AcademyNomination AS an
+        JOIN Category AS c ON c.categoryId = an.categoryId
+        JOIN Role     AS r ON r.roleId     = c.roleId
+        WHERE r.statsRole = 'actor' LIMIT 1
+    """,
+    "role_leaderboard": "SELECT 1",
+}
+SAMPLE_PARAMS["stats_nominations"] = SAMPLE_PARAMS["stats_totals"]
+
+
+def load_dump():
+    """Import theOscars_dump.sql with the mysql command-line client."""
+    database = os.getenv("MYSQL_DATABASE", "theOscars")
+    cmd = [
+        "mysql",
+        f"--host={os.getenv('MYSQL_HOST', '127.0.0.1')}",
+        f"--port={os.getenv('MYSQL_PORT', '3306')}",
+        f"--user={os.getenv('MYSQL_USER', 'root')}",
+    ]
+    env = dict(os.environ)
+    if os.getenv("MYSQL_PASSWORD"):
+        env["MYSQL_PWD"] = os.getenv("MYSQL_PASSWORD")
+    subprocess.run(cmd + ["-e", f"CREATE DATABASE IF NOT EXISTS `{database}`"],
+                   check=True, env=env)
+    with open(DUMP, "rb") as f:
+        subprocess.run(cmd + [database], stdin=f, check=True, env=env)
+
+
+def sample_params(cur, name):
+    lookup = SAMPLE_PARAMS.get(name)
+    if lookup is None:
+        return ()
+    cur.execute(lookup)
+    row = cur.fetchone()
+    if row is None:
+        return None
+    return tuple(row)
+
+
+def _walk(node, plan):
+    if isinstance(node, dict):
+        if "table_name" in node and "access_type" in node:
+            plan["tables"][node["table_name"]] = {
+                "access_type": node["access_type"],
+                "key": node.get("key"),
+                "rows": node.get("rows_examined_per_scan"),
+            }
+        if node.get("using_filesort"):
+            plan["filesort"] = True
+        if node.get("using_temporary_table"):
+            plan["temporary"] = True
+        for value in node.values():
+            _walk(value, plan)
+    elif isinstance(node, list):
+        for value in node:
+            _walk(value, plan)
+
+
+def explain(cur, sql, params):
+    cur.execute("EXPLAIN FORMAT=JSON " + sql, params)
+    doc = json.loads(cur.fetchone()[0])
+    plan = {"tables": {}, "filesort": False, "temporary": False}
+    _walk(doc, plan)
+    return plan
+
+
+def explain_analyze(cur, sql, params):
+    cur.execute("EXPLAIN ANALYZE " + sql, params)
+    return cur.fetchone()[0]
+
+
+def compare(name, old, new):
+    """Return (failures, warnings) for one statement."""
+    failures, warnings = [], []
+    for table, now in new["tables"].items():
+        before = old["tables"].get(table)
+        if before is None:
+            continue
+        if now["access_type"] == "ALL" and before["access_type"] != "ALL":
+            failures.append(
+                f"{name}: {table} became a full scan "
+                f"(was {before['access_type']} on {before['key']})"
+            )
+        elif (now["rows"] and before["rows"]
+              and now["rows"] >= MIN_ROWS
+              and now["rows"] > before["rows"] * ROWS_FACTOR):
+            failures.append(
+                f"{name}: {table} examines {now['rows']} rows per scan "
+                f"(was {before['rows']})"
+            )
+    for flag in ("filesort", "temporary"):
+        if new[flag] and not old[flag]:
+            warnings.append(f"{name}: now uses a {flag}")
+    return failures, warnings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--load", action="store_true",
+                        help="import theDump/theOscars_dump.sql and migrate it first")
+    parser.add_argument("--update", action="store_true",
+                        help="write the current plans as the new baseline")
+    parser.add_argument("--analyze", action="store_true",
+                        help="also run EXPLAIN ANALYZE and print the tree")
+    parser.add_argument("--baseline", default=BASELINE)
+    args = parser.parse_args()
+
+    if args.load:
+        load_dump()
+
+    conn = get_db()
+    if args.load:
+        migrate.up(conn)
+    cur = conn.cursor()
+    plans = {}
+    for name, stmt in sorted(queries.STATEMENTS.items()):
+        # Every SELECT, including the ones that must run on the primary.
+        if stmt.sql.split(None, 1)[0].upper() != "SELECT":
+            continue
+        params = sample_params(cur, name)
+        if params is None:
+            print(f"skip {name}: no sample data")
+            continue
+        params = params + stmt.bound
+        plans[name] = explain(cur, stmt.sql, params)
+        tables = ", ".join(
+            f"{t}={p['access_type']}/{p['rows']}"
+            for t, p in plans[name]["tables"].items()
+        )
+        extra = "".join(
+            f" +{flag}" for flag in ("filesort", "temporary") if plans[name][flag]
+        )
+        print(f"{name}: {tables}{extra}")
+        if args.analyze:
+            print(explain_analyze(cur, stmt.sql, params))
+    cur.close()
+    conn.close()
+
+    if args.update:
+        with open(args.baseline, "w") as f:
+            json.dump(plans, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Wrote baseline for {len(plans)} statements to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; record one with --update and commit it.")
+        return 1
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    failures, warnings = [], []
+    for name, plan in plans.items():
+        if name not in baseline:
+            warnings.append(f"{name}: not in baseline")
+            continue
+        failed, warned = compare(name, baseline[name], plan)
+        failures += failed
+        warnings += warned
+
+    for line in warnings:
+        print("WARNING", line)
+    for line in failures:
+        print("REGRESSION", line)
+    print(f"{len(plans)} statements checked, {len(failures)} regressions")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
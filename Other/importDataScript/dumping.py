@@ -1,6 +1,14 @@
+import os
+import sys
 import csv
 import mysql.connector
 
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from ingest import finish_load  # noqa: E402
+import prerender  # noqa: E402
+import snapshot  # noqa: E402
+import analytics  # noqa: E402
+
 # 1. Connect to your MySQL database
 connection = mysql.connector.connect(
     host="localhost",
@@ -73,9 +81,14 @@ with open(csv_file_path, mode="r", encoding="utf-8-sig") as f:
             connection.rollback()
             failed_rows.append((data_tuple, str(err)))
 
-# 5. Clean up
+# 5. Fill in dimension codes for anything inserted by name, then clean up
 cursor.close()
+finish_load(connection)
 connection.close()
+snapshot.build()
+if analytics.ENABLED:
+    analytics.build()
+prerender.build()
 
 # 6. Print summary
 print(f"Successfully inserted {row_count} rows into AcademyNomination.")
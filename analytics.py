@@ -0,0 +1,216 @@
+"""
+Embedded SQLite copy of the Oscar tables for the read-only views.
+
+    python analytics.py           # export the current data to SQLite
+
+The dataset is a few MB, so with ANALYTICS_BACKEND=sqlite every
+reference statement in queries.py (the ones with a ``ttl``) runs
+in-process against a SQLite file instead of making a round trip to
+MySQL. MySQL keeps Users, UserNomination and DataVersion, and every
+write.
+
+The file is exported from MySQL - after migrations and ingest.py, so it
+has the dimension ids and summary tables the statements expect - to
+ANALYTICS_DIR/<data version>.sqlite, with indexes matching the MySQL
+ones. Workers open the file for the live data version read-only (one
+connection per thread). Without a file for that version, statements go
+to MySQL as usual. ingest.py exports a new file after each load when
+the backend is enabled.
+
+Statements run unchanged apart from placeholders; the few that use
+MySQL-only syntax carry a ``sqlite`` variant in queries.py.
+"""
+import os
+import sys
+import time
+import sqlite3
+import datetime
+import threading
+from decimal import Decimal
+import cache
+import metrics
+
+ENABLED = os.getenv("ANALYTICS_BACKEND", "mysql") == "sqlite"
+ANALYTICS_DIR = os.getenv(
+    "ANALYTICS_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "build", "analytics")
+)
+KEEP_FILES = 2
+
+# Tables the reference statements read.
+TABLES = [
+    "Person", "Movie", "Category", "Role", "Country", "Language",
+    "ProductionCompany", "MovieProductionCompany", "AcademyNomination",
+    "CompanyWins", "CountryGroupTotals", "NonEnglishWinner",
+]
+
+INDEXES = [
+    "CREATE UNIQUE INDEX pk_person ON Person (personId)",
+    "CREATE INDEX idx_person_country ON Person (countryOfBirthId)",
+    "CREATE UNIQUE INDEX pk_movie ON Movie (movieId)",
+    "CREATE UNIQUE INDEX pk_category ON Category (categoryId)",
+    "CREATE INDEX idx_category_role ON Category (roleId)",
+    "CREATE UNIQUE INDEX pk_role ON Role (roleId)",
+    "CREATE INDEX idx_role_stats ON Role (statsRole)",
+    "CREATE UNIQUE INDEX pk_country ON Country (countryId)",
+    "CREATE UNIQUE INDEX pk_language ON Language (languageId)",
+    "CREATE UNIQUE INDEX pk_company ON ProductionCompany (companyId)",
+    "CREATE INDEX idx_mpc_movie ON MovieProductionCompany (movieId, companyId)",
+    "CREATE INDEX idx_an_category_granted_person"
+    " ON AcademyNomination (categoryId, grantedOrNot, personId)",
+    "CREATE INDEX idx_an_person_category ON AcademyNomination (personId, categoryId)",
+    "CREATE INDEX idx_cw_wins ON CompanyWins (wins DESC)",
+    "CREATE INDEX idx_cgt_wins ON CountryGroupTotals (groupName, wins DESC)",
+    "CREATE INDEX idx_cgt_nominations ON CountryGroupTotals (groupName, nominations DESC)",
+    "CREATE INDEX idx_new_year_title ON NonEnglishWinner (year DESC, title)",
+]
+
+# Dates come back as the same types mysql-connector returns.
+sqlite3.register_converter("DATE", lambda b: datetime.date.fromisoformat(b.decode()))
+sqlite3.register_converter("DATETIME", lambda b: datetime.datetime.fromisoformat(b.decode()))
+
+_local = threading.local()   # .version, .conn for this thread
+_sql = {}                    # statement name -> SQLite text
+
+
+def _path(version):
+    return os.path.join(ANALYTICS_DIR, f"{version}.sqlite")
+
+
+def _connection():
+    """This thread's connection to the file for the live version, or None."""
+    version = cache.data_version()
+    if version is None:
+        return None
+    if getattr(_local, "version", None) == version:
+        return _local.conn
+    path = _path(version)
+    if not os.path.exists(path):
+        return None
+    old = getattr(_local, "conn", None)
+    if old is not None:
+        old.close()
+    _local.conn = sqlite3.connect(
+        f"file:{path}?mode=ro&immutable=1", uri=True,
+        detect_types=sqlite3.PARSE_DECLTYPES, check_same_thread=False
+    )
+    _local.version = version
+    return _local.conn
+
+
+def sql_for(name, stmt):
+    if name not in _sql:
+        _sql[name] = stmt.sqlite or stmt.sql.replace("%s", "?")
+    return _sql[name]
+
+
+def run(name, stmt, params):
+    """Rows for ``stmt`` from SQLite, or None when there is no current file."""
+    conn = _connection()
+    if conn is None:
+        return None
+    start = time.perf_counter()
+    rows = conn.execute(sql_for(name, stmt), tuple(params) + stmt.bound).fetchall()
+    metrics.observe_query(name, time.perf_counter() - start, len(rows))
+    metrics.inc("analytics_queries_total", statement=name)
+    return rows
+
+
+# ---- export ----------------------------------------------------------------
+
+def _decltype(values):
+    for v in values:
+        if v is None:
+            continue
+        if isinstance(v, int):
+            return "INTEGER"
+        if isinstance(v, (float, Decimal)):
+            return "REAL"
+        if isinstance(v, datetime.datetime):
+            return "DATETIME"
+        if isinstance(v, datetime.date):
+            return "DATE"
+        if isinstance(v, (bytes, bytearray)):
+            return "BLOB"
+        # Case-insensitive like the MySQL tables' default collation.
+        return "TEXT COLLATE NOCASE"
+    return ""
+
+
+def _value(v):
+    if isinstance(v, Decimal):
+        return float(v)
+    if isinstance(v, datetime.datetime):
+        return v.isoformat(sep=" ")
+    if isinstance(v, datetime.date):
+        return v.isoformat()
+    if isinstance(v, datetime.timedelta):
+        return v.total_seconds()
+    return v
+
+
+def export(mysql_conn, path):
+    """Copy TABLES from ``mysql_conn`` into a new SQLite file at ``path``."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    lite = sqlite3.connect(tmp)
+    try:
+        cur = mysql_conn.cursor()
+        for table in TABLES:
+            cur.execute(f"SELECT * FROM {table}")
+            columns = [d[0] for d in cur.description]
+            rows = cur.fetchall()
+            types = [_decltype(col) for col in zip(*rows)] if rows else [""] * len(columns)
+            definition = ", ".join(f'"{c}" {t}'.strip() for c, t in zip(columns, types))
+            lite.execute(f"CREATE TABLE {table} ({definition})")
+            lite.executemany(
+                f"INSERT INTO {table} VALUES ({', '.join('?' for _ in columns)})",
+                ([_value(v) for v in row] for row in rows)
+            )
+        cur.close()
+        for ddl in INDEXES:
+            lite.execute(ddl)
+        lite.execute("ANALYZE")
+        lite.commit()
+    finally:
+        lite.close()
+    os.replace(tmp, path)
+
+
+def build():
+    """Export the current data version; returns the file's path."""
+    from db import get_db
+
+    conn = get_db()
+    try:
+        cur = conn.cursor()
+        cur.execute("SELECT version FROM DataVersion WHERE id = 1")
+        (version,) = cur.fetchone()
+        cur.close()
+        os.makedirs(ANALYTICS_DIR, exist_ok=True)
+        path = _path(version)
+        export(conn, path)
+    finally:
+        conn.close()
+    _prune(version)
+    return path
+
+
+def _prune(current_version):
+    versions = sorted(
+        int(name[:-7]) for name in os.listdir(ANALYTICS_DIR)
+        if name.endswith(".sqlite") and name[:-7].isdigit()
+    )
+    for version in versions[:-KEEP_FILES]:
+        if version != current_version:
+            os.remove(_path(version))
+
+
+def main():
+    print(f"Wrote {build()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+"""
+Fingerprinted, pre-compressed static files.
+
+    python assets.py              # download vendor files, then build
+    python assets.py --offline    # build from what is already in static/
+
+bin/post_compile runs the first form on every deploy, so the slug
+carries the vendored files.
+
+The build copies every file under static/ to ASSETS_DIR with a hash of
+its content in the name (logo.svg -> logo.3f2a9c1b7d4e.svg), writes .gz
+and .br (when the brotli package is installed) copies next to it, and
+records the names in manifest.json. Third-party files listed in VENDOR
+are downloaded into static/vendor/ first and checked against their
+published integrity hash, so pages no longer depend on the CDN.
+
+Templates link files with ``asset_url("vendor/bootstrap.min.css")``.
+Built files are served from /assets/ with a one-year "immutable"
+Cache-Control, since any change gives them a new name. gunicorn.conf.py
+runs the offline build once in the master at start-up, before the
+workers fork; importing the app never builds or downloads anything.
+Without a build, asset_url falls back to /static/ (or, for a vendor
+file not downloaded yet, to its CDN URL).
+"""
+import os
+import sys
+import json
+import gzip
+import base64
+import shutil
+import hashlib
+import mimetypes
+import urllib.request
+from flask import request, send_file, url_for, abort
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+STATIC_DIR = os.path.join(ROOT, "static")
+ASSETS_DIR = os.getenv("ASSETS_DIR", os.path.join(ROOT, "build", "assets"))
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+# static path -> (download URL, Subresource Integrity hash)
+VENDOR = {
+    "vendor/bootstrap.min.css": (
+        "https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css",
+        "sha384-9ndCyUaIbzAi2FUVXJi0CjmCapSmO7SnpJef0486qhLnuZ2cdeRhO02iuK6FUUVM",
+    ),
+}
+
+# Not worth compressing: already compressed formats.
+PRECOMPRESSED_TYPES = (".png", ".jpg", ".jpeg", ".gif", ".webp", ".woff", ".woff2", ".gz", ".br")
+
+_manifest = (None, {})   # (mtime, {static path: built path})
+
+
+# ---- build -----------------------------------------------------------------
+
+def _integrity(data, algorithm="sha384"):
+    digest = hashlib.new(algorithm, data).digest()
+    return f"{algorithm}-{base64.b64encode(digest).decode()}"
+
+
+def vendor():
+    """Download missing VENDOR files; returns the number fetched."""
+    fetched = 0
+    for name, (url, integrity) in VENDOR.items():
+        path = os.path.join(STATIC_DIR, name)
+        if os.path.exists(path):
+            continue
+        with urllib.request.urlopen(url, timeout=30) as response:
+            data = response.read()
+        algorithm = integrity.split("-", 1)[0]
+        if _integrity(data, algorithm) != integrity:
+            raise RuntimeError(f"{url} does not match its integrity hash")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+        fetched += 1
+    return fetched
+
+
+def _fingerprinted(name, data):
+    stem, ext = os.path.splitext(name)
+    return f"{stem}.{hashlib.sha256(data).hexdigest()[:12]}{ext}"
+
+
+def _write(path, data, compress):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+    if not compress:
+        return
+    with open(path + ".gz", "wb") as f:
+        f.write(gzip.compress(data, 9))
+    if brotli is not None:
+        with open(path + ".br", "wb") as f:
+            f.write(brotli.compress(data, quality=11))
+
+
+def build():
+    """Fingerprint and compress everything in static/; returns the manifest."""
+    manifest = {}
+    staging = ASSETS_DIR + f".{os.getpid()}.tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    for dirpath, _, filenames in os.walk(STATIC_DIR):
+        for filename in sorted(filenames):
+            path = os.path.join(dirpath, filename)
+            name = os.path.relpath(path, STATIC_DIR).replace(os.sep, "/")
+            with open(path, "rb") as f:
+                data = f.read()
+            built = _fingerprinted(name, data)
+            compress = not filename.lower().endswith(PRECOMPRESSED_TYPES)
+            _write(os.path.join(staging, built), data, compress)
+            manifest[name] = built
+    with open(os.path.join(staging, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+
+    old = ASSETS_DIR + f".{os.getpid()}.old"
+    if os.path.exists(ASSETS_DIR):
+        os.replace(ASSETS_DIR, old)
+    os.replace(staging, ASSETS_DIR)
+    shutil.rmtree(old, ignore_errors=True)
+    return manifest
+
+
+# ---- serving ---------------------------------------------------------------
+
+def manifest():
+    """{static path: built path}, re-read when manifest.json changes."""
+    global _manifest
+    path = os.path.join(ASSETS_DIR, "manifest.json")
+    try:
+        mtime = os.stat(path).st_mtime
+    except OSError:
+        return {}
+    if _manifest[0] != mtime:
+        with open(path) as f:
+            _manifest = (mtime, json.load(f))
+    return _manifest[1]
+
+
+def asset_url(name):
+    built = manifest().get(name)
+    if built is not None:
+        return url_for("assets", filename=built)
+    if name in VENDOR and not os.path.exists(os.path.join(STATIC_DIR, name)):
+        return VENDOR[name][0]
+    return url_for("static", filename=name)
+
+
+def _view(filename):
+    path = safe_join(ASSETS_DIR, filename)
+    if path is None or filename == "manifest.json" or not os.path.isfile(path):
+        abort(404)
+    sent, encoding = path, None
+    if brotli is not None and request.accept_encodings["br"] and os.path.exists(path + ".br"):
+        sent, encoding = path + ".br", "br"
+    elif request.accept_encodings["gzip"] and os.path.exists(path + ".gz"):
+        sent, encoding = path + ".gz", "gzip"
+    mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    response = send_file(sent, mimetype=mimetype, etag=True, conditional=True)
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    response.vary.add("Accept-Encoding")
+    response.headers["Cache-Control"] = IMMUTABLE
+    return response
+
+
+def init_app(app):
+    app.add_url_rule("/assets/<path:filename>", "assets", _view)
+    app.context_processor(lambda: {"asset_url": asset_url})
+
+
+def main(argv):
+    if "--offline" not in argv:
+        print(f"Downloaded {vendor()} vendor files.")
+    print(f"Built {len(build())} assets into {ASSETS_DIR}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
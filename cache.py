@@ -0,0 +1,366 @@
+"""
+Per-worker cache for the results of reference-data statements.
+
+Statements in queries.py that only read tables filled by the import
+scripts declare a ``ttl``; their rows are kept here, keyed by statement
+name and parameters, so repeat requests skip the database entirely.
+
+* Bounded: at most QUERY_CACHE_MAX_ENTRIES results and roughly
+  QUERY_CACHE_MAX_MB of rows, evicting the least recently used first.
+* Expiring: each entry lives for its statement's TTL.
+* Versioned: ingest.finish_load bumps DataVersion.version. Every
+  DATA_VERSION_POLL_SECONDS the cache reads it (from any replica, so an
+  older version than the last one seen is ignored) and, if it moved
+  forward, drops everything, so a new import shows up within a few
+  seconds in every worker. If the poll fails the cache keeps serving
+  what it has.
+* Coalesced: when a result has to be computed, one caller runs the
+  statement and everyone else asking for it waits for that result -
+  threads in this worker through an Event, other gunicorn workers
+  through a lock file in SINGLEFLIGHT_DIR, next to which the result is
+  left for them to read (as JSON). The directory must belong to this
+  user with mode 0700; otherwise coalescing stays per worker.
+* Refreshed early: a hit may recompute its entry before it expires,
+  with a probability that grows as expiry nears and with how long the
+  statement took (the "XFetch" rule), so busy keys are renewed by one
+  caller while everyone else still gets the cached rows.
+
+Hits, misses, evictions, coalesced waits and early refreshes are
+counted in metrics.py.
+"""
+import os
+import sys
+import json
+import math
+import stat
+import time
+import random
+import decimal
+import hashlib
+import datetime
+import logging
+import threading
+from collections import OrderedDict, namedtuple
+import mysql.connector
+from db import get_db
+import metrics
+
+try:
+    import fcntl
+except ImportError:  # not on Windows; coalescing then stays per worker
+    fcntl = None
+
+ENABLED = os.getenv("QUERY_CACHE", "1") != "0"
+MAX_ENTRIES = int(os.getenv("QUERY_CACHE_MAX_ENTRIES", 1024))
+MAX_BYTES = int(float(os.getenv("QUERY_CACHE_MAX_MB", 32)) * 1024 * 1024)
+POLL_SECONDS = float(os.getenv("DATA_VERSION_POLL_SECONDS", 5))
+VERSION_BUDGET_MS = int(os.getenv("DATA_VERSION_BUDGET_MS", 200))
+
+SINGLEFLIGHT_DIR = os.getenv("SINGLEFLIGHT_DIR") or os.path.join(
+    os.getenv("XDG_RUNTIME_DIR")
+    or os.path.join(os.path.dirname(os.path.abspath(__file__)), "build"),
+    "oscars-singleflight"
+)
+# How long a caller waits for someone else's computation before running
+# the statement itself.
+WAIT_SECONDS = float(os.getenv("SINGLEFLIGHT_WAIT_SECONDS", 5))
+# >1 refreshes earlier, <1 later; 0 turns early refresh off.
+XFETCH_BETA = float(os.getenv("QUERY_CACHE_XFETCH_BETA", 1))
+
+# delta: seconds the statement took; computed_at: wall-clock time it ran.
+_Entry = namedtuple("_Entry", "rows expires_at size delta computed_at")
+
+_lock = threading.Lock()
+_entries = OrderedDict()   # key -> _Entry
+_bytes = 0
+_version = None
+_updated_at = None
+_polled_at = 0.0
+_inflight = {}             # key -> _Flight
+_shared_ok = None          # SINGLEFLIGHT_DIR checked and safe to use
+
+log = logging.getLogger(__name__)
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.rows = None
+        self.error = None
+
+
+def _sizeof(rows):
+    """Rough in-memory size of a result: the list, its tuples, their values."""
+    size = sys.getsizeof(rows)
+    for row in rows:
+        size += sys.getsizeof(row) + sum(sys.getsizeof(v) for v in row)
+    return size
+
+
+def _drop(key):
+    global _bytes
+    _bytes -= _entries.pop(key).size
+
+
+def clear():
+    global _bytes
+    with _lock:
+        _entries.clear()
+        _bytes = 0
+
+
+def _read_version():
+    conn = get_db(readonly=True)
+    try:
+        cur = conn.cursor()
+        # Its own short budget: the route's is not set yet, and the
+        # session's may be anything the last request left.
+        cur.execute(
+            f"SELECT /*+ MAX_EXECUTION_TIME({VERSION_BUDGET_MS}) */ version, updatedAt"
+            " FROM DataVersion WHERE id = 1"
+        )
+        row = cur.fetchone()
+        cur.close()
+    finally:
+        conn.close()
+    return tuple(row) if row else (0, None)
+
+
+def data_version():
+    """The dataset version, re-read at most every POLL_SECONDS."""
+    global _version, _updated_at, _polled_at
+    now = time.monotonic()
+    if _version is not None and now - _polled_at < POLL_SECONDS:
+        return _version
+    _polled_at = now
+    try:
+        version, updated_at = _read_version()
+    except mysql.connector.Error:
+        return _version
+    if _version is not None and version < _version:
+        # A replica further behind than the last one read; the version
+        # only ever moves forward, so keep what this worker has.
+        return _version
+    if version != _version:
+        # Moved before the clear, so _put refuses rows from the old version.
+        previous, _version = _version, version
+        if previous is not None:
+            clear()
+    _updated_at = updated_at
+    return _version
+
+
+def data_updated_at():
+    """When the dataset version last moved (naive, UTC), or None."""
+    data_version()
+    return _updated_at
+
+
+def _put(key, rows, ttl, delta, computed_at, version):
+    """Cache ``rows`` unless the data version has moved since ``version``."""
+    global _bytes
+    size = _sizeof(rows)
+    if size > MAX_BYTES:
+        return
+    evicted = []
+    with _lock:
+        if version != _version:
+            return
+        if key in _entries:
+            _drop(key)
+        _entries[key] = _Entry(rows, time.monotonic() + ttl, size, delta, computed_at)
+        _bytes += size
+        while len(_entries) > MAX_ENTRIES or _bytes > MAX_BYTES:
+            oldest = next(iter(_entries))
+            evicted.append(oldest[0])
+            _drop(oldest)
+    for statement in evicted:
+        metrics.inc("query_cache_evictions_total", statement=statement)
+
+
+def _refresh_early(entry, now):
+    """XFetch: recompute with probability rising towards expiry."""
+    if not XFETCH_BETA or not entry.delta:
+        return False
+    return now - entry.delta * XFETCH_BETA * math.log(random.random() or 1e-12) >= entry.expires_at
+
+
+# ---- cross-worker coalescing ---------------------------------------------
+
+def _shared_dir():
+    """True once SINGLEFLIGHT_DIR is a directory only this user can use."""
+    global _shared_ok
+    if _shared_ok is None:
+        try:
+            os.makedirs(SINGLEFLIGHT_DIR, mode=0o700, exist_ok=True)
+            st = os.lstat(SINGLEFLIGHT_DIR)
+        except OSError:
+            st = None
+        _shared_ok = (st is not None and stat.S_ISDIR(st.st_mode)
+                      and st.st_uid == os.getuid()
+                      and stat.S_IMODE(st.st_mode) == 0o700)
+        if not _shared_ok:
+            log.warning("Not coalescing across workers: %s must be a directory "
+                        "owned by uid %d with mode 0700", SINGLEFLIGHT_DIR, os.getuid())
+    return _shared_ok
+
+
+def _encode(value):
+    """JSON for the row values MySQL and SQLite return besides the plain ones."""
+    if isinstance(value, datetime.datetime):
+        return {"$datetime": value.isoformat()}
+    if isinstance(value, datetime.date):
+        return {"$date": value.isoformat()}
+    if isinstance(value, datetime.timedelta):
+        return {"$timedelta": value.total_seconds()}
+    if isinstance(value, decimal.Decimal):
+        return {"$decimal": str(value)}
+    raise TypeError(f"Cannot share a {type(value).__name__} value")
+
+
+def _decode(obj):
+    if "$datetime" in obj:
+        return datetime.datetime.fromisoformat(obj["$datetime"])
+    if "$date" in obj:
+        return datetime.date.fromisoformat(obj["$date"])
+    if "$timedelta" in obj:
+        return datetime.timedelta(seconds=obj["$timedelta"])
+    if "$decimal" in obj:
+        return decimal.Decimal(obj["$decimal"])
+    return obj
+
+
+def _shared_path(key):
+    digest = hashlib.sha1(repr(key).encode()).hexdigest()
+    return os.path.join(SINGLEFLIGHT_DIR, digest)
+
+
+def _flock(f):
+    """Take the lock on ``f``, giving up after WAIT_SECONDS."""
+    deadline = time.monotonic() + WAIT_SECONDS
+    while True:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except BlockingIOError:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+
+
+def _read_shared(path, version, newer_than):
+    """The result another worker left, if it is current and newer."""
+    try:
+        with open(path + ".result") as f:
+            shared = json.load(f, object_hook=_decode)
+    except (OSError, ValueError):
+        return None
+    if (shared["version"] != version
+            or shared["expires_at"] <= time.time()
+            or shared["computed_at"] <= newer_than):
+        return None
+    shared["rows"] = [tuple(row) for row in shared["rows"]]
+    return shared
+
+
+def _write_shared(path, version, rows, delta, computed_at, ttl):
+    try:
+        data = json.dumps({
+            "version": version,
+            "rows": rows,
+            "delta": delta,
+            "computed_at": computed_at,
+            "expires_at": computed_at + ttl,
+        }, default=_encode)
+    except TypeError:
+        return   # other workers compute it themselves
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        f.write(data)
+    os.replace(tmp, path + ".result")
+
+
+def _compute(key, version, ttl, compute, newer_than):
+    """Run ``compute`` once across workers; returns (rows, delta, computed_at, ttl)."""
+    def run():
+        start = time.perf_counter()
+        rows = compute()
+        return rows, time.perf_counter() - start, time.time(), ttl
+
+    if fcntl is None or not _shared_dir():
+        return run()
+    path = _shared_path(key)
+    with open(path + ".lock", "a") as lock:
+        locked = _flock(lock)
+        try:
+            shared = _read_shared(path, version, newer_than)
+            if shared is not None:
+                metrics.inc("query_cache_coalesced_total", statement=key[0])
+                remaining = shared["expires_at"] - time.time()
+                return shared["rows"], shared["delta"], shared["computed_at"], remaining
+            rows, delta, computed_at, ttl = run()
+            if version == _version:
+                _write_shared(path, version, rows, delta, computed_at, ttl)
+            return rows, delta, computed_at, ttl
+        finally:
+            if locked:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+# ---- public entry point --------------------------------------------------
+
+def fetch(name, params, ttl, compute):
+    """
+    The rows for statement ``name`` with ``params``: from the cache, from
+    a computation already in flight, or from ``compute()``.
+    """
+    if not ENABLED:
+        return compute()
+    version = data_version()
+    key = (name, params)
+    now = time.monotonic()
+    with _lock:
+        entry = _entries.get(key)
+        if entry is not None and entry.expires_at <= now:
+            _drop(key)
+            entry = None
+        if entry is not None:
+            _entries.move_to_end(key)
+        refresh = entry is not None and _refresh_early(entry, now)
+        if entry is None or refresh:
+            flight = _inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = _inflight[key] = _Flight()
+
+    if entry is not None and (not refresh or not leader):
+        # Fresh enough, or someone else is already refreshing it.
+        metrics.inc("query_cache_hits_total", statement=name)
+        return entry.rows
+
+    if not leader:
+        metrics.inc("query_cache_coalesced_total", statement=name)
+        if not flight.done.wait(WAIT_SECONDS):
+            return compute()
+        if flight.error is not None:
+            raise flight.error
+        return flight.rows
+
+    if refresh:
+        metrics.inc("query_cache_early_refreshes_total", statement=name)
+    else:
+        metrics.inc("query_cache_misses_total", statement=name)
+    try:
+        rows, delta, computed_at, remaining = _compute(
+            key, version, ttl, compute, entry.computed_at if entry else 0
+        )
+        _put(key, rows, remaining, delta, computed_at, version)
+        flight.rows = rows
+        return rows
+    except BaseException as e:
+        flight.error = e
+        raise
+    finally:
+        with _lock:
+            _inflight.pop(key, None)
+        flight.done.set()
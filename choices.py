@@ -0,0 +1,95 @@
+"""
+The /nominate choice lists as one JSON bundle the browser caches.
+
+    /choices/<digest>.json -> {"persons": [[id, label], ...],
+                               "movies": [...], "categories": [...]}
+
+The bundle is built once per data version (from snapshot.py when it
+has the lists, MySQL otherwise) and named by a hash of its content, so
+its URL changes exactly when the lists do and the response can be
+cached for good - by the browser only, as it needs a login like the
+page itself. It is served pre-compressed (brotli when the package is
+installed, gzip otherwise). The nominate page only carries the URL and
+fills its selects from the bundle on the client.
+"""
+import json
+import gzip
+import hashlib
+import threading
+from collections import namedtuple
+from flask import request, make_response, redirect, url_for
+import cache
+import queries
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+IMMUTABLE = "private, max-age=31536000, immutable"
+
+_Bundle = namedtuple("_Bundle", "version digest raw gz br")
+
+_lock = threading.Lock()
+_bundle = None
+
+
+def _build(version):
+    data = {
+        "persons": [list(row) for row in queries.fetchall("nominate_persons")],
+        "movies": [list(row) for row in queries.fetchall("nominate_movies")],
+        "categories": [list(row) for row in queries.fetchall("nominate_categories")],
+    }
+    raw = json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode()
+    return _Bundle(
+        version,
+        hashlib.sha256(raw).hexdigest()[:16],
+        raw,
+        gzip.compress(raw, 9),
+        brotli.compress(raw, quality=11) if brotli is not None else None,
+    )
+
+
+def current():
+    """The bundle for the live data version, built on first use."""
+    global _bundle
+    version = cache.data_version()
+    bundle = _bundle
+    if bundle is not None and bundle.version == version:
+        return bundle
+    with _lock:
+        if _bundle is None or _bundle.version != version:
+            _bundle = _build(version)
+        return _bundle
+
+
+def url():
+    return url_for("choices", digest=current().digest)
+
+
+def _view(digest):
+    bundle = current()
+    if digest != bundle.digest:
+        # A page rendered before the last import; point it at the new lists.
+        response = redirect(url_for("choices", digest=bundle.digest))
+        response.headers["Cache-Control"] = "no-cache"
+        return response
+
+    if bundle.br is not None and request.accept_encodings["br"]:
+        body, encoding = bundle.br, "br"
+    elif request.accept_encodings["gzip"]:
+        body, encoding = bundle.gz, "gzip"
+    else:
+        body, encoding = bundle.raw, None
+    response = make_response(body)
+    response.mimetype = "application/json"
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    response.vary.add("Accept-Encoding")
+    response.headers["Cache-Control"] = IMMUTABLE
+    response.set_etag(f"{digest}-{encoding or 'identity'}")
+    return response.make_conditional(request)
+
+
+def init_app(app, login_required):
+    app.add_url_rule("/choices/<digest>.json", "choices", login_required(_view))
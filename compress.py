@@ -0,0 +1,145 @@
+"""
+WSGI middleware that compresses text responses on the fly.
+
+Rendered pages (the /stats and /top_nominated tables in particular) go
+out as gzip, or brotli when the client accepts it and the package is
+installed. The body is compressed chunk by chunk as the app yields it,
+flushing after each chunk so streamed pages still arrive progressively.
+
+A response is left alone when it is:
+
+* smaller than COMPRESS_MIN_BYTES (it is buffered up to that size to
+  find out),
+* already encoded (pre-compressed assets, pre-rendered pages, bundles),
+* not text, JSON, JavaScript or SVG, or marked ``no-transform``,
+* a HEAD request or has no body (204, 304).
+"""
+import os
+import zlib
+from werkzeug.datastructures import Headers
+from werkzeug.http import parse_accept_header
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ENABLED = os.getenv("COMPRESS", "1") != "0"
+MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", 1024))
+GZIP_LEVEL = int(os.getenv("COMPRESS_GZIP_LEVEL", 6))
+BROTLI_QUALITY = int(os.getenv("COMPRESS_BROTLI_QUALITY", 5))
+
+COMPRESSIBLE = ("text/", "application/json", "application/javascript", "image/svg+xml")
+
+
+class _Gzip:
+    encoding = "gzip"
+
+    def __init__(self):
+        self._z = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def chunk(self, data):
+        return self._z.compress(data) + self._z.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._z.flush()
+
+
+class _Brotli:
+    encoding = "br"
+
+    def __init__(self):
+        self._c = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def chunk(self, data):
+        return self._c.process(data) + self._c.flush()
+
+    def finish(self):
+        return self._c.finish()
+
+
+def _choose(environ):
+    accepted = parse_accept_header(environ.get("HTTP_ACCEPT_ENCODING", ""))
+    if brotli is not None and accepted["br"]:
+        return _Brotli
+    if accepted["gzip"]:
+        return _Gzip
+    return None
+
+
+def _compressible(status, headers):
+    if not status.startswith("200"):
+        return False
+    if "Content-Encoding" in headers:
+        return False
+    if "no-transform" in headers.get("Cache-Control", ""):
+        return False
+    mimetype = headers.get("Content-Type", "").split(";")[0].strip()
+    return mimetype.startswith(COMPRESSIBLE)
+
+
+class CompressMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    def __call__(self, environ, start_response):
+        codec = _choose(environ) if ENABLED else None
+        if codec is None or environ.get("REQUEST_METHOD") == "HEAD":
+            return self.app(environ, start_response)
+
+        captured = {}
+
+        def capture(status, headers, exc_info=None):
+            if exc_info is not None and captured.get("sent"):
+                raise exc_info[1].with_traceback(exc_info[2])
+            captured.update(status=status, headers=Headers(headers), exc_info=exc_info)
+            return self._unbuffered_write
+
+        app_iter = self.app(environ, capture)
+        return self._respond(app_iter, captured, codec, start_response)
+
+    @staticmethod
+    def _unbuffered_write(data):
+        raise RuntimeError("CompressMiddleware does not support write()")
+
+    def _respond(self, app_iter, captured, codec, start_response):
+        try:
+            chunks = iter(app_iter)
+            buffered, size = [], 0
+            # Buffer up to MIN_BYTES to decide whether compression is worth it.
+            for data in chunks:
+                buffered.append(data)
+                size += len(data)
+                if size >= MIN_BYTES:
+                    break
+
+            status, headers = captured["status"], captured["headers"]
+            if size < MIN_BYTES or not _compressible(status, headers):
+                start_response(status, headers.to_wsgi_list(), captured["exc_info"])
+                captured["sent"] = True
+                yield from buffered
+                yield from chunks
+                return
+
+            compressor = codec()
+            headers.remove("Content-Length")
+            headers["Content-Encoding"] = compressor.encoding
+            vary = headers.get("Vary")
+            headers["Vary"] = f"{vary}, Accept-Encoding" if vary else "Accept-Encoding"
+            if headers.get("ETag", "").startswith('"'):
+                # The compressed body is a different representation.
+                headers["ETag"] = "W/" + headers["ETag"]
+            start_response(status, headers.to_wsgi_list(), captured["exc_info"])
+            captured["sent"] = True
+
+            out = compressor.chunk(b"".join(buffered))
+            if out:
+                yield out
+            for data in chunks:
+                out = compressor.chunk(data)
+                if out:
+                    yield out
+            yield compressor.finish()
+        finally:
+            if hasattr(app_iter, "close"):
+                app_iter.close()
@@ -0,0 +1,112 @@
+"""
+Conditional GETs for pages that only change when the dataset does.
+
+``@conditional`` gives a view a strong ETag built from the dataset
+version (see cache.py), the endpoint, its URL arguments and the release
+being served, plus a Last-Modified from the later of the time the
+version last moved and the time the templates or assets last changed
+on disk (so a deploy invalidates both). A browser revalidating with If-None-Match / If-Modified-Since
+gets a 304 before the view runs, so neither MySQL nor Jinja is touched.
+
+The pages sit behind the login and every logged-in user sees the same
+markup, so by default they are cacheable by the browser only
+(HTTP_CACHE_CONTROL); a proxy that keys on the session cookie can be
+allowed in by setting it to "public, ...".
+"""
+import os
+import json
+import hashlib
+from datetime import datetime, timezone
+from functools import wraps
+from flask import request, session, make_response, get_flashed_messages
+import cache
+import assets
+
+CACHE_CONTROL = os.getenv("HTTP_CACHE_CONTROL", "private, max-age=60, must-revalidate")
+# Changes the ETags when new code is deployed; Heroku-style platforms
+# set SOURCE_VERSION to the commit being built. Without either, see
+# _deployment().
+RELEASE = os.getenv("APP_RELEASE") or os.getenv("SOURCE_VERSION", "")
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+
+_deployed = None   # (release, when the templates or assets last changed)
+
+
+def _deployment():
+    """
+    (RELEASE or else a fingerprint of the template files - names, mtimes,
+    sizes - and the assets manifest, their newest mtime as a UTC
+    datetime), taken once per worker on first use: after
+    gunicorn.conf.py has built the assets.
+    """
+    global _deployed
+    if _deployed is None:
+        h = hashlib.sha1()
+        newest = 0.0
+        for dirpath, dirnames, filenames in os.walk(TEMPLATES_DIR):
+            dirnames.sort()
+            for filename in sorted(filenames):
+                st = os.stat(os.path.join(dirpath, filename))
+                h.update(f"{dirpath}/{filename}\0{st.st_mtime_ns}\0{st.st_size}\0".encode())
+                newest = max(newest, st.st_mtime)
+        h.update(json.dumps(assets.manifest(), sort_keys=True).encode())
+        try:
+            manifest = os.path.join(assets.ASSETS_DIR, "manifest.json")
+            newest = max(newest, os.stat(manifest).st_mtime)
+        except OSError:
+            pass
+        _deployed = (RELEASE or h.hexdigest(),
+                     datetime.fromtimestamp(newest, timezone.utc))
+    return _deployed
+
+
+def _etag(version):
+    parts = [
+        _deployment()[0],
+        str(version),
+        request.endpoint or "",
+        repr(sorted((request.view_args or {}).items())),
+        repr(sorted(request.args.items(multi=True))),
+    ]
+    return hashlib.sha1("\0".join(parts).encode()).hexdigest()
+
+
+def _not_modified(etag, last_modified):
+    if request.if_none_match:
+        # Weak comparison: compress.py marks the tag weak on gzipped bodies.
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since:
+        return last_modified.replace(microsecond=0) <= request.if_modified_since
+    return False
+
+
+def conditional(view):
+    """Answer GETs with 304 while the dataset version is unchanged."""
+    @wraps(view)
+    def wrapped(**kwargs):
+        # Pending flashes are shown on whatever page renders next.
+        if request.method not in ("GET", "HEAD") or session.get("_flashes"):
+            return view(**kwargs)
+        version = cache.data_version()
+        if version is None:
+            return view(**kwargs)
+        updated_at = cache.data_updated_at()
+        last_modified = _deployment()[1]
+        if updated_at:
+            last_modified = max(last_modified, updated_at.replace(tzinfo=timezone.utc))
+        etag = _etag(version)
+
+        if _not_modified(etag, last_modified):
+            response = make_response("", 304)
+        else:
+            response = make_response(view(**kwargs))
+            if (response.status_code != 200
+                    or response.headers.get("X-Stale")
+                    or get_flashed_messages()):
+                return response
+        response.set_etag(etag)
+        response.last_modified = last_modified
+        response.headers["Cache-Control"] = CACHE_CONTROL
+        response.vary.add("Cookie")
+        return response
+    return wrapped
@@ -1,4 +1,5 @@
 import os
+import sys
 import requests
 from bs4 import BeautifulSoup
 import csv
@@ -6,6 +7,9 @@ import re
 import pandas as pd
 from datetime import datetime
 
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from db import get_db  # noqa: E402
+
 
 def ordinal(n):
     """
@@ -92,15 +96,25 @@ ensure_csv_with_header(final_academy_csv_filename, final_academy_fieldnames)
 start_iteration = 1
 end_iteration = 96
 
-category_mapping = {
-    "Outstanding Picture": "Best Picture",
-    "Outstanding Production": "Best Picture",
-    "Outstanding Motion Picture": "Best Picture",
-    "Best Motion Picture": "Best Picture",
-    "Best Picture": "Best Picture",
-    "Best Art Direction": "Best Production Design",
-    "Best Production Design": "Best Production Design"
-}
+def load_category_mapping():
+    """
+    Wikipedia's category heading -> the category name we store, from the
+    CategoryAlias table (see migrations/0003_dimensions.up.sql).
+    """
+    conn = get_db()
+    try:
+        cur = conn.cursor()
+        cur.execute("""
+            SELECT ca.alias, c.categoryName
+            FROM CategoryAlias AS ca
+            JOIN Category AS c ON c.categoryId = ca.categoryId
+        """)
+        return dict(cur.fetchall())
+    finally:
+        conn.close()
+
+
+category_mapping = load_category_mapping()
 
 # Helper functions
 def split_name(full_name):
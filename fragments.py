@@ -0,0 +1,117 @@
+"""
+Cache for rendered template fragments that only depend on the dataset.
+
+    {% fragmentcache "stats-persons", role %}
+      {% for key, label in persons %}...{% endfor %}
+    {% endfragmentcache %}
+
+The first render stores the block's HTML under its key (any number of
+comma-separated expressions) plus the dataset version; later renders
+reuse it without running the block. Entries are dropped, least recently
+used first, once they add up to FRAGMENT_CACHE_MAX_MB, and all of them
+when the dataset version moves.
+
+Views pass the block's data wrapped in ``lazy(...)`` so the query behind
+it only runs when the block actually renders.
+"""
+import os
+import sys
+import threading
+from collections import OrderedDict
+from jinja2 import nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+import cache
+import metrics
+
+ENABLED = os.getenv("FRAGMENT_CACHE", "1") != "0"
+MAX_BYTES = int(float(os.getenv("FRAGMENT_CACHE_MAX_MB", 16)) * 1024 * 1024)
+
+_lock = threading.Lock()
+_fragments = OrderedDict()   # key -> (html, size), all for _version
+_bytes = 0
+_version = None
+
+
+class lazy:
+    """An iterable that calls ``fn(*args)`` the first time it is used."""
+
+    def __init__(self, fn, *args):
+        self._fn = fn
+        self._args = args
+        self._value = None
+
+    def _get(self):
+        if self._value is None:
+            self._value = self._fn(*self._args)
+        return self._value
+
+    def __iter__(self):
+        return iter(self._get())
+
+    def __len__(self):
+        return len(self._get())
+
+    def __bool__(self):
+        return bool(self._get())
+
+
+def _get(key, version):
+    global _bytes, _version
+    with _lock:
+        if version != _version:
+            _fragments.clear()
+            _bytes = 0
+            _version = version
+        entry = _fragments.get(key)
+        if entry is not None:
+            _fragments.move_to_end(key)
+            return entry[0]
+    return None
+
+
+def _put(key, html):
+    global _bytes
+    size = sys.getsizeof(html)
+    if size > MAX_BYTES:
+        return
+    with _lock:
+        old = _fragments.pop(key, None)
+        if old is not None:
+            _bytes -= old[1]
+        _fragments[key] = (html, size)
+        _bytes += size
+        while _bytes > MAX_BYTES:
+            _, (_, dropped) = _fragments.popitem(last=False)
+            _bytes -= dropped
+
+
+class FragmentCacheExtension(Extension):
+    tags = {"fragmentcache"}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        key = [parser.parse_expression()]
+        while parser.stream.skip_if("comma"):
+            key.append(parser.parse_expression())
+        body = parser.parse_statements(["name:endfragmentcache"], drop_needle=True)
+        call = self.call_method("_render", [nodes.List(key)])
+        return nodes.CallBlock(call, [], [], body).set_lineno(lineno)
+
+    def _render(self, key, caller):
+        version = cache.data_version() if ENABLED else None
+        if version is None:
+            return caller()
+        key = tuple(key)
+        html = _get(key, version)
+        if html is not None:
+            metrics.inc("fragment_cache_hits_total", fragment=key[0])
+            return Markup(html)
+        metrics.inc("fragment_cache_misses_total", fragment=key[0])
+        html = caller()
+        _put(key, str(html))
+        return html
+
+
+def init_app(app):
+    app.jinja_env.add_extension(FragmentCacheExtension)
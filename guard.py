@@ -0,0 +1,98 @@
+"""
+Development/test guard against query-count regressions.
+
+When the app is in debug or testing mode (or QUERY_GUARD=1), every
+statement run through queries.py is recorded for the current request.
+After the view returns, the guard logs:
+
+  * views that ran more statements than their ``@max_queries(n)`` budget;
+  * statements that share a shape (same SQL once literals and IN-list
+    lengths are ignored) and ran more than once, the usual sign of a
+    per-row or copy-pasted query that should be a single one.
+
+Under ``app.testing`` an exceeded budget raises QueryBudgetExceeded, so
+the test that made the request fails.
+"""
+import os
+import re
+from collections import Counter
+from functools import wraps
+from flask import g, request, current_app
+
+FORCE = os.getenv("QUERY_GUARD") == "1"
+
+_shapes = {}
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def max_queries(n):
+    """Declare how many statements the decorated view may run."""
+    def decorator(view):
+        @wraps(view)
+        def wrapped(**kwargs):
+            g.max_queries = n
+            return view(**kwargs)
+        return wrapped
+    return decorator
+
+
+def shape(sql):
+    """Normalise SQL so statements differing only in literals compare equal."""
+    s = re.sub(r"'(?:[^'\\]|\\.)*'", "?", sql)
+    s = re.sub(r"\b\d+\b", "?", s)
+    s = s.replace("%s", "?")
+    s = re.sub(r"IN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", "IN (?)", s, flags=re.I)
+    return " ".join(s.split())
+
+
+def record(name, sql):
+    """Called by queries.py for each statement; a no-op when inactive."""
+    if "guard_log" not in g:
+        return
+    if name not in _shapes:
+        _shapes[name] = shape(sql)
+    g.guard_log.append(name)
+
+
+def _active(app):
+    return FORCE or app.debug or app.testing
+
+
+def _start():
+    if _active(current_app):
+        g.guard_log = []
+
+
+def _check(response):
+    log = g.pop("guard_log", None)
+    if log is None:
+        return response
+    endpoint = request.endpoint or request.path
+
+    repeated = Counter(_shapes[name] for name in log)
+    for sql_shape, count in repeated.items():
+        if count > 1:
+            names = sorted({n for n in log if _shapes[n] == sql_shape})
+            current_app.logger.warning(
+                "%s ran the same query shape %d times (%s)",
+                endpoint, count, ", ".join(names)
+            )
+
+    budget = g.get("max_queries")
+    if budget is not None and len(log) > budget:
+        message = (
+            f"{endpoint} ran {len(log)} queries, budget is {budget}: "
+            + ", ".join(log)
+        )
+        current_app.logger.warning(message)
+        if current_app.testing:
+            raise QueryBudgetExceeded(message)
+    return response
+
+
+def init_app(app):
+    app.before_request(_start)
+    app.after_request(_check)
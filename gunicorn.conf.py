@@ -0,0 +1,46 @@
+"""
+gunicorn settings (see the Procfile).
+
+Static assets are built once in the master (see assets.py), and the app
+is imported and its templates compiled there before forking, so workers
+start with them in memory; each worker then opens its own MySQL pools
+and loads the reference data before it accepts a request (see
+warmup.py). /readyz reports when that is done.
+"""
+import os
+import shutil
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", 2))
+preload_app = True
+# Warm-up runs inside post_fork, before the worker's first heartbeat.
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 60))
+
+
+def on_starting(server):
+    import metrics
+    import cache
+    import assets
+    metrics.clear_dir()
+    shutil.rmtree(cache.SINGLEFLIGHT_DIR, ignore_errors=True)
+    try:
+        server.log.info("Built %d static assets", len(assets.build()))
+    except OSError as e:
+        server.log.warning("Could not build static assets: %s", e)
+
+
+def when_ready(server):
+    import warmup
+    from app import app
+    count = warmup.compile_templates(app)
+    server.log.info("Compiled %d templates", count)
+
+
+def post_fork(server, worker):
+    import db
+    import warmup
+    from app import app
+    # Pools built in the master would share its sockets.
+    db.reset_pool()
+    if warmup.warm(app):
+        worker.log.info("Worker %s warmed up", worker.pid)
@@ -0,0 +1,152 @@
+"""
+Post-import steps for theOscars database.
+
+The import scripts insert rows by name. Run this once they finish (the
+importers call ``finish_load`` themselves) so every new category,
+language, country or production company gets its dimension row and the
+fact rows that arrived with an unknown name get their integer code.
+In the same transaction it rebuilds the leaderboard summary tables and
+bumps the dataset version, which tells every app worker to drop
+its cached reference data (see cache.py), and writes the shared
+snapshot for the new version (see snapshot.py).
+
+    python ingest.py                  # also re-renders the static pages
+    python ingest.py --no-prerender
+"""
+import sys
+from db import get_db
+import queries
+
+# (dimension table, its id, its name column,
+#  fact table, fact name column, fact id column)
+DIMENSIONS = [
+    ("Category", "categoryId", "categoryName",
+     "AcademyNomination", "category", "categoryId"),
+    ("Category", "categoryId", "categoryName",
+     "UserNomination", "category", "categoryId"),
+    ("Language", "languageId", "languageName",
+     "Movie", "movieLanguage", "languageId"),
+    ("Country", "countryId", "countryName",
+     "Person", "countryOfBirth", "countryOfBirthId"),
+    ("Country", "countryId", "countryName",
+     "MovieCountry", "country", "countryId"),
+    ("ProductionCompany", "companyId", "companyName",
+     "MovieProductionCompany", "productionCompany", "companyId"),
+]
+
+
+def sync_dimensions(cur):
+    """Add missing dimension rows and fill NULL codes; returns rows fixed."""
+    fixed = 0
+    for dim, dim_id, dim_name, fact, fact_name, fact_id in DIMENSIONS:
+        cur.execute(f"""
+            INSERT IGNORE INTO {dim} ({dim_name})
+            SELECT DISTINCT {fact_name} FROM {fact}
+            WHERE {fact_id} IS NULL
+              AND {fact_name} IS NOT NULL
+              AND {fact_name} <> ''
+        """)
+        cur.execute(f"""
+            UPDATE {fact} AS f
+              JOIN {dim} AS d ON d.{dim_name} = f.{fact_name}
+               SET f.{fact_id} = d.{dim_id}
+             WHERE f.{fact_id} IS NULL
+        """)
+        fixed += cur.rowcount
+    return fixed
+
+
+# CountryGroupTotals.groupName -> the Role.roleName values it covers.
+COUNTRY_GROUPS = {
+    queries.BEST_ACTOR_GROUP: queries.BEST_ACTOR_ROLES,
+}
+
+
+def refresh_summaries(cur):
+    """Rebuild the summary tables of migration 0006 (the caller commits)."""
+    # DELETE rather than TRUNCATE, which would commit; readers keep
+    # seeing the old rows until finish_load commits.
+    cur.execute("DELETE FROM CompanyWins")
+    cur.execute("""
+        INSERT INTO CompanyWins (companyId, companyName, wins)
+        SELECT pc.companyId, pc.companyName, COUNT(*)
+        FROM AcademyNomination AS an
+        JOIN MovieProductionCompany AS mpc ON mpc.movieId = an.movieId
+        JOIN ProductionCompany AS pc ON pc.companyId = mpc.companyId
+        WHERE an.grantedOrNot = 1
+        GROUP BY pc.companyId, pc.companyName
+    """)
+
+    cur.execute("DELETE FROM CountryGroupTotals")
+    for group, roles in COUNTRY_GROUPS.items():
+        cur.execute(f"""
+            INSERT INTO CountryGroupTotals
+              (groupName, countryId, countryName, wins, nominations)
+            SELECT %s, co.countryId, co.countryName,
+                   SUM(an.grantedOrNot = 1), COUNT(*)
+            FROM AcademyNomination AS an
+            JOIN Category AS c  ON c.categoryId = an.categoryId
+            JOIN Role     AS r  ON r.roleId     = c.roleId
+            JOIN Person   AS p  ON p.personId   = an.personId
+            JOIN Country  AS co ON co.countryId = p.countryOfBirthId
+            WHERE r.roleName IN ({", ".join("%s" for _ in roles)})
+            GROUP BY co.countryId, co.countryName
+        """, (group, *roles))
+
+    cur.execute("DELETE FROM NonEnglishWinner")
+    cur.execute("""
+        INSERT INTO NonEnglishWinner (movieId, title, year, languageName)
+        SELECT DISTINCT m.movieId, m.title, YEAR(m.releaseDate), l.languageName
+        FROM AcademyNomination AS an
+        JOIN Movie AS m ON m.movieId = an.movieId
+        JOIN Language AS l ON l.languageId = m.languageId
+        WHERE an.grantedOrNot = 1
+          AND l.isEnglish = 0
+          AND l.isKnown   = 1
+    """)
+
+
+def bump_version(cur):
+    cur.execute("""
+        UPDATE DataVersion
+           SET version = version + 1, updatedAt = UTC_TIMESTAMP()
+         WHERE id = 1
+    """)
+
+
+def finish_load(conn):
+    """Bring derived data up to date after an import; commits."""
+    cur = conn.cursor()
+    try:
+        fixed = sync_dimensions(cur)
+        refresh_summaries(cur)
+        bump_version(cur)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+    return fixed
+
+
+def main(argv):
+    conn = get_db()
+    try:
+        fixed = finish_load(conn)
+    finally:
+        conn.close()
+    print(f"Dimension codes filled in for {fixed} rows.")
+    import snapshot
+    print(f"Wrote {snapshot.build()}")
+    import analytics
+    if analytics.ENABLED:
+        print(f"Wrote {analytics.build()}")
+    if "--no-prerender" not in argv:
+        import prerender
+        print(f"Pre-rendered {prerender.build()} pages.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,36 @@
+"""
+Top living Oscar winners per dream-team role.
+
+One windowed query ranks the living winners of every role at once (see
+"role_leaderboard" in queries.py); categories belong to a role through
+Category.roleId. Places come from RANK(), so people level on wins share
+a place and everyone tied with the k-th place is listed - a board can
+hold more than k people. Results are cached per k like any reference
+statement, so the ranking runs once per data version.
+"""
+from collections import OrderedDict, namedtuple
+import queries
+
+DEFAULT_K = 10
+MAX_K = 50
+
+Entry = namedtuple("Entry", "place person_id name wins")
+
+
+def top(k=DEFAULT_K):
+    """{role name: [Entry, ...]} for every role, in role order."""
+    k = max(1, min(int(k), MAX_K))
+    board = OrderedDict()
+    for role, place, person_id, first, last, wins in queries.fetchall("role_leaderboard", (k,)):
+        entries = board.setdefault(role, [])
+        if person_id is not None:
+            entries.append(Entry(place, person_id, f"{first} {last}", wins))
+    return board
+
+
+def winners(board):
+    """{role name: [Entry, ...]} holding only each role's first place."""
+    return OrderedDict(
+        (role, [e for e in entries if e.place == 1])
+        for role, entries in board.items()
+    )
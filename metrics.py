@@ -0,0 +1,240 @@
+"""
+In-process request and SQL metrics, exposed in Prometheus text format.
+
+Each gunicorn worker keeps its numbers in memory and, at most once every
+METRICS_FLUSH_SECONDS, writes them to its own file in METRICS_DIR. The
+/metrics endpoint sums every worker's file, so whichever worker answers
+the scrape reports the totals for the whole server.
+"""
+import os
+import hmac
+import json
+import time
+import tempfile
+import threading
+from flask import g, request, Response, abort, has_app_context
+
+METRICS_DIR = os.getenv(
+    "METRICS_DIR", os.path.join(tempfile.gettempdir(), "oscars-metrics")
+)
+FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", 1))
+# When set, /metrics requires "Authorization: Bearer <token>"; when not,
+# it only answers requests from this machine.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+LOOPBACK = ("127.0.0.1", "::1")
+
+SECONDS_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34)
+
+HISTOGRAMS = {
+    "http_request_duration_seconds":
+        ("Request latency by endpoint.", SECONDS_BUCKETS),
+    "db_query_duration_seconds":
+        ("Time spent executing and fetching one statement.", SECONDS_BUCKETS),
+    "db_request_sql_seconds":
+        ("Total SQL time per request by endpoint.", SECONDS_BUCKETS),
+    "db_request_queries":
+        ("Statements executed per request by endpoint.", COUNT_BUCKETS),
+    "db_connection_acquire_seconds":
+        ("Time to check a connection out of the pool.", SECONDS_BUCKETS),
+}
+COUNTERS = {
+    "db_rows_fetched_total": "Rows fetched by statement.",
+    "db_queries_total": "Statements executed by statement.",
+    "query_cache_hits_total": "Statement results served from the cache.",
+    "query_cache_misses_total": "Cacheable statements that had to run.",
+    "query_cache_evictions_total": "Cached results evicted to stay under the size caps.",
+    "query_cache_coalesced_total": "Cache misses served by another caller's computation.",
+    "query_cache_early_refreshes_total": "Cached results recomputed ahead of expiry.",
+    "fragment_cache_hits_total": "Template fragments served from the cache.",
+    "fragment_cache_misses_total": "Template fragments that had to render.",
+    "snapshot_reads_total": "Statements answered from the shared snapshot file.",
+    "analytics_queries_total": "Reference statements run on the embedded SQLite backend.",
+}
+
+_lock = threading.Lock()
+_histograms = {}   # (name, labels) -> [bucket counts..., sum, count]
+_counters = {}     # (name, labels) -> value
+_last_flush = 0.0
+
+
+def _labels(**labels):
+    return tuple(sorted(labels.items()))
+
+
+def observe(name, value, **labels):
+    buckets = HISTOGRAMS[name][1]
+    key = (name, _labels(**labels))
+    with _lock:
+        series = _histograms.get(key)
+        if series is None:
+            series = _histograms[key] = [0] * (len(buckets) + 2)
+        for i, bound in enumerate(buckets):
+            if value <= bound:
+                series[i] += 1
+                break
+        series[-2] += value
+        series[-1] += 1
+
+
+def inc(name, amount=1, **labels):
+    key = (name, _labels(**labels))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + amount
+
+
+def observe_query(statement, seconds, rows):
+    """Called by queries.py for every statement it runs."""
+    observe("db_query_duration_seconds", seconds, statement=statement)
+    inc("db_queries_total", statement=statement)
+    if rows:
+        inc("db_rows_fetched_total", rows, statement=statement)
+    if has_app_context() and "metrics_sql_seconds" in g:
+        g.metrics_sql_seconds += seconds
+        g.metrics_queries += 1
+
+
+def observe_acquire(seconds):
+    observe("db_connection_acquire_seconds", seconds)
+
+
+# ---- cross-worker aggregation ------------------------------------------
+
+def _path(pid):
+    return os.path.join(METRICS_DIR, f"worker-{pid}.json")
+
+
+def flush(force=False):
+    """Write this worker's numbers to its file (throttled)."""
+    global _last_flush
+    now = time.monotonic()
+    if not force and now - _last_flush < FLUSH_SECONDS:
+        return
+    _last_flush = now
+    with _lock:
+        data = {
+            "histograms": [[n, l, s] for (n, l), s in _histograms.items()],
+            "counters": [[n, l, v] for (n, l), v in _counters.items()],
+        }
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    tmp = _path(os.getpid()) + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp, _path(os.getpid()))
+
+
+def clear_dir():
+    """Forget numbers from previous runs; call once when the server starts."""
+    if os.path.isdir(METRICS_DIR):
+        for name in os.listdir(METRICS_DIR):
+            if name.startswith("worker-"):
+                os.remove(os.path.join(METRICS_DIR, name))
+
+
+def _merged():
+    histograms, counters = {}, {}
+    for name in os.listdir(METRICS_DIR):
+        if not (name.startswith("worker-") and name.endswith(".json")):
+            continue
+        try:
+            with open(os.path.join(METRICS_DIR, name)) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        for n, l, series in data["histograms"]:
+            key = (n, tuple(map(tuple, l)))
+            total = histograms.setdefault(key, [0] * len(series))
+            for i, v in enumerate(series):
+                total[i] += v
+        for n, l, v in data["counters"]:
+            key = (n, tuple(map(tuple, l)))
+            counters[key] = counters.get(key, 0) + v
+    return histograms, counters
+
+
+def _fmt_labels(labels, extra=()):
+    items = list(labels) + list(extra)
+    if not items:
+        return ""
+    body = ",".join(
+        '{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"'))
+        for k, v in items
+    )
+    return "{" + body + "}"
+
+
+def render():
+    flush(force=True)
+    histograms, counters = _merged()
+    lines = []
+    for name, (help_text, buckets) in HISTOGRAMS.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} histogram")
+        for (n, labels), series in sorted(histograms.items()):
+            if n != name:
+                continue
+            cumulative = 0
+            for bound, count in zip(buckets, series):
+                cumulative += count
+                le = _fmt_labels(labels, [("le", bound)])
+                lines.append(f"{name}_bucket{le} {cumulative}")
+            lines.append(f"{name}_bucket{_fmt_labels(labels, [('le', '+Inf')])} {series[-1]}")
+            lines.append(f"{name}_sum{_fmt_labels(labels)} {series[-2]}")
+            lines.append(f"{name}_count{_fmt_labels(labels)} {series[-1]}")
+    for name, help_text in COUNTERS.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} counter")
+        for (n, labels), value in sorted(counters.items()):
+            if n == name:
+                lines.append(f"{name}{_fmt_labels(labels)} {value}")
+    return "\n".join(lines) + "\n"
+
+
+# ---- Flask wiring --------------------------------------------------------
+
+def _start():
+    g.metrics_start = time.perf_counter()
+    g.metrics_sql_seconds = 0.0
+    g.metrics_queries = 0
+
+
+def _finish(status):
+    start = g.pop("metrics_start", None)
+    if start is None:
+        return
+    endpoint = request.endpoint or "unknown"
+    if endpoint in ("metrics", "static"):
+        return
+    observe("http_request_duration_seconds", time.perf_counter() - start,
+            endpoint=endpoint, method=request.method, status=status)
+    observe("db_request_sql_seconds", g.metrics_sql_seconds, endpoint=endpoint)
+    observe("db_request_queries", g.metrics_queries, endpoint=endpoint)
+    flush()
+
+
+def _after(response):
+    _finish(response.status_code)
+    return response
+
+
+def _teardown(e=None):
+    # Only reached with the timer still set when the view raised.
+    if e is not None:
+        _finish(500)
+
+
+def _metrics_view():
+    if METRICS_TOKEN:
+        given = request.headers.get("Authorization", "")
+        if not hmac.compare_digest(given.encode(), f"Bearer {METRICS_TOKEN}".encode()):
+            abort(403)
+    elif request.remote_addr not in LOOPBACK:
+        abort(403)
+    return Response(render(), mimetype="text/plain; version=0.0.4")
+
+
+def init_app(app):
+    app.before_request(_start)
+    app.after_request(_after)
+    app.teardown_request(_teardown)
+    app.add_url_rule("/metrics", "metrics", _metrics_view)
@@ -0,0 +1,129 @@
+"""
+Versioned schema migrations for theOscars database.
+
+Each migration is a pair of files in migrations/:
+
+    NNNN_description.up.sql     applied by "up"
+    NNNN_description.down.sql   reverts it, applied by "down"
+
+Applied versions are tracked in the schema_migrations table.
+
+    python migrate.py status
+    python migrate.py up [VERSION]      # apply everything up to VERSION
+    python migrate.py down [VERSION]    # revert everything above VERSION
+                                        # (default: only the latest one)
+
+Statements in a file are separated by a ";" at the end of a line. MySQL
+commits DDL implicitly, so a failing migration can be left half-applied;
+its down file is written to tolerate that where it can.
+"""
+import os
+import re
+import sys
+from db import get_db
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+
+
+def available():
+    """[(version, name)] for every migration on disk, in order."""
+    found = []
+    for filename in sorted(os.listdir(MIGRATIONS_DIR)):
+        m = re.match(r"^(\d{4})_(.+)\.up\.sql$", filename)
+        if m:
+            found.append((m.group(1), m.group(2)))
+    return found
+
+
+def statements(sql):
+    lines = [l for l in sql.splitlines() if not l.strip().startswith("--")]
+    return [s.strip() for s in re.split(r";\s*$", "\n".join(lines), flags=re.M) if s.strip()]
+
+
+def _path(version, name, direction):
+    return os.path.join(MIGRATIONS_DIR, f"{version}_{name}.{direction}.sql")
+
+
+def applied(cur):
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+          version   CHAR(4)     NOT NULL PRIMARY KEY,
+          name      VARCHAR(100) NOT NULL,
+          appliedAt DATETIME    NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cur.execute("SELECT version FROM schema_migrations")
+    return {row[0] for row in cur.fetchall()}
+
+
+def run(conn, version, name, direction):
+    cur = conn.cursor()
+    with open(_path(version, name, direction), encoding="utf-8") as f:
+        for stmt in statements(f.read()):
+            cur.execute(stmt)
+    if direction == "up":
+        cur.execute(
+            "INSERT INTO schema_migrations (version, name) VALUES (%s, %s)",
+            (version, name)
+        )
+    else:
+        cur.execute("DELETE FROM schema_migrations WHERE version = %s", (version,))
+    conn.commit()
+    cur.close()
+
+
+def up(conn, target=None):
+    cur = conn.cursor()
+    done = applied(cur)
+    cur.close()
+    for version, name in available():
+        if target and version > target:
+            break
+        if version not in done:
+            print(f"Applying {version}_{name}")
+            run(conn, version, name, "up")
+
+
+def down(conn, target=None):
+    cur = conn.cursor()
+    done = applied(cur)
+    cur.close()
+    todo = [(v, n) for v, n in reversed(available()) if v in done]
+    if target is None:
+        todo = todo[:1]
+    else:
+        todo = [(v, n) for v, n in todo if v > target]
+    for version, name in todo:
+        print(f"Reverting {version}_{name}")
+        run(conn, version, name, "down")
+
+
+def status(conn):
+    cur = conn.cursor()
+    done = applied(cur)
+    cur.close()
+    for version, name in available():
+        mark = "x" if version in done else " "
+        print(f"[{mark}] {version}_{name}")
+
+
+def main(argv):
+    if not argv or argv[0] not in ("status", "up", "down"):
+        print(__doc__)
+        return 1
+    conn = get_db()
+    try:
+        command, target = argv[0], (argv[1] if len(argv) > 1 else None)
+        if command == "status":
+            status(conn)
+        elif command == "up":
+            up(conn, target)
+        else:
+            down(conn, target)
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,14 @@
+ALTER TABLE UserNomination
+  DROP INDEX idx_un_year_movie,
+  DROP INDEX idx_un_category_movie,
+  DROP COLUMN releaseYear;
+
+ALTER TABLE Person
+  DROP INDEX idx_person_death,
+  DROP INDEX idx_person_country;
+
+ALTER TABLE AcademyNomination
+  DROP INDEX idx_an_granted_movie;
+
+ALTER TABLE AcademyNomination
+  DROP INDEX idx_an_category_granted;
@@ -0,0 +1,23 @@
+-- Indexes for the analytics views plus a stored release year on
+-- UserNomination so /top_nominated can filter by year through an index.
+-- InnoDB appends the primary key to every secondary index, so these are
+-- covering for the person/movie joins that follow them.
+
+-- /dream_team, /top_actor_countries, /stats: category lists + wins
+ALTER TABLE AcademyNomination
+  ADD INDEX idx_an_category_granted (category, grantedOrNot);
+
+-- /top_companies, /non_english_winners: every win, joined to its movie
+ALTER TABLE AcademyNomination
+  ADD INDEX idx_an_granted_movie (grantedOrNot, movieTitle, movieReleaseDate);
+
+-- /staff_by_country and the country list; /dream_team living filter
+ALTER TABLE Person
+  ADD INDEX idx_person_country (countryOfBirth),
+  ADD INDEX idx_person_death (deathDate);
+
+-- /top_nominated filters and their per-movie GROUP BY
+ALTER TABLE UserNomination
+  ADD COLUMN releaseYear SMALLINT AS (YEAR(movieReleaseDate)) STORED,
+  ADD INDEX idx_un_category_movie (category, movieTitle, movieReleaseDate),
+  ADD INDEX idx_un_year_movie (releaseYear, movieTitle, movieReleaseDate);
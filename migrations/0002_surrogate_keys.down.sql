@@ -0,0 +1,70 @@
+DROP TRIGGER IF EXISTS trg_mpc_ids;
+DROP TRIGGER IF EXISTS trg_mc_ids;
+DROP TRIGGER IF EXISTS trg_un_ids;
+DROP TRIGGER IF EXISTS trg_pw_ids;
+DROP TRIGGER IF EXISTS trg_an_ids;
+
+ALTER TABLE MovieProductionCompany
+  DROP FOREIGN KEY fk_mpc_movie,
+  DROP INDEX idx_mpc_movie,
+  DROP COLUMN movieId;
+
+ALTER TABLE MovieCountry
+  DROP FOREIGN KEY fk_mc_movie,
+  DROP INDEX idx_mc_movie,
+  DROP COLUMN movieId;
+
+ALTER TABLE UserNomination
+  DROP FOREIGN KEY fk_un_person,
+  DROP FOREIGN KEY fk_un_movie,
+  DROP INDEX idx_un_user,
+  DROP INDEX idx_un_category_movie,
+  DROP INDEX idx_un_year_movie,
+  ADD INDEX idx_un_category_movie (category, movieTitle, movieReleaseDate),
+  ADD INDEX idx_un_year_movie (releaseYear, movieTitle, movieReleaseDate);
+
+ALTER TABLE UserNomination
+  DROP INDEX fk_un_person,
+  DROP INDEX fk_un_movie,
+  DROP COLUMN personId,
+  DROP COLUMN movieId;
+
+ALTER TABLE PersonWorkedOnMovie
+  DROP FOREIGN KEY fk_pw_person,
+  DROP FOREIGN KEY fk_pw_movie,
+  DROP INDEX idx_pw_person,
+  DROP INDEX idx_pw_movie,
+  DROP COLUMN personId,
+  DROP COLUMN movieId;
+
+ALTER TABLE AcademyNomination
+  DROP FOREIGN KEY fk_an_person,
+  DROP FOREIGN KEY fk_an_movie,
+  DROP INDEX idx_an_category_granted_person,
+  DROP INDEX idx_an_granted_movie,
+  DROP INDEX idx_an_person_category,
+  ADD INDEX idx_an_category_granted (category, grantedOrNot),
+  ADD INDEX idx_an_granted_movie (grantedOrNot, movieTitle, movieReleaseDate);
+
+ALTER TABLE AcademyNomination
+  DROP INDEX fk_an_movie,
+  DROP COLUMN personId,
+  DROP COLUMN movieId;
+
+ALTER TABLE Movie
+  DROP PRIMARY KEY,
+  ADD PRIMARY KEY (title, releaseDate),
+  ADD UNIQUE KEY movieId (movieId);
+
+ALTER TABLE Movie
+  DROP INDEX uq_movie_natural,
+  DROP COLUMN movieId;
+
+ALTER TABLE Person
+  DROP PRIMARY KEY,
+  ADD PRIMARY KEY (firstName, lastName, birthDate),
+  ADD UNIQUE KEY personId (personId);
+
+ALTER TABLE Person
+  DROP INDEX uq_person_natural,
+  DROP COLUMN personId;
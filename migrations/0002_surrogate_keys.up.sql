@@ -0,0 +1,175 @@
+-- Integer surrogate keys for Person and Movie.
+--
+-- personId / movieId become the clustered primary keys; the old natural
+-- keys stay as UNIQUE keys so existing foreign keys and the import
+-- scripts keep working. Every child table gets the id columns, backfilled
+-- here and filled by BEFORE INSERT triggers for rows inserted by name.
+
+ALTER TABLE Person
+  ADD COLUMN personId INT UNSIGNED NOT NULL AUTO_INCREMENT UNIQUE FIRST,
+  ADD UNIQUE KEY uq_person_natural (firstName, lastName, birthDate);
+
+ALTER TABLE Person
+  DROP PRIMARY KEY,
+  ADD PRIMARY KEY (personId),
+  DROP INDEX personId;
+
+ALTER TABLE Movie
+  ADD COLUMN movieId INT UNSIGNED NOT NULL AUTO_INCREMENT UNIQUE FIRST,
+  ADD UNIQUE KEY uq_movie_natural (title, releaseDate);
+
+ALTER TABLE Movie
+  DROP PRIMARY KEY,
+  ADD PRIMARY KEY (movieId),
+  DROP INDEX movieId;
+
+-- AcademyNomination -------------------------------------------------------
+
+ALTER TABLE AcademyNomination
+  ADD COLUMN personId INT UNSIGNED NULL FIRST,
+  ADD COLUMN movieId  INT UNSIGNED NULL AFTER personId;
+
+UPDATE AcademyNomination AS an
+  JOIN Person AS p
+    ON p.firstName = an.personFirstName
+   AND p.lastName  = an.personLastName
+   AND p.birthDate = an.personBirthDate
+  JOIN Movie AS m
+    ON m.title       = an.movieTitle
+   AND m.releaseDate = an.movieReleaseDate
+   SET an.personId = p.personId,
+       an.movieId  = m.movieId;
+
+ALTER TABLE AcademyNomination
+  MODIFY personId INT UNSIGNED NOT NULL,
+  MODIFY movieId  INT UNSIGNED NOT NULL,
+  DROP INDEX idx_an_category_granted,
+  DROP INDEX idx_an_granted_movie,
+  ADD INDEX idx_an_category_granted_person (category, grantedOrNot, personId),
+  ADD INDEX idx_an_granted_movie (grantedOrNot, movieId),
+  ADD INDEX idx_an_person_category (personId, category),
+  ADD CONSTRAINT fk_an_person FOREIGN KEY (personId) REFERENCES Person (personId),
+  ADD CONSTRAINT fk_an_movie  FOREIGN KEY (movieId)  REFERENCES Movie (movieId);
+
+CREATE TRIGGER trg_an_ids BEFORE INSERT ON AcademyNomination FOR EACH ROW
+  SET NEW.personId = COALESCE(NEW.personId, (
+        SELECT personId FROM Person
+        WHERE firstName = NEW.personFirstName
+          AND lastName  = NEW.personLastName
+          AND birthDate = NEW.personBirthDate)),
+      NEW.movieId = COALESCE(NEW.movieId, (
+        SELECT movieId FROM Movie
+        WHERE title = NEW.movieTitle AND releaseDate = NEW.movieReleaseDate));
+
+-- PersonWorkedOnMovie -----------------------------------------------------
+
+ALTER TABLE PersonWorkedOnMovie
+  ADD COLUMN personId INT UNSIGNED NULL FIRST,
+  ADD COLUMN movieId  INT UNSIGNED NULL AFTER personId;
+
+UPDATE PersonWorkedOnMovie AS pw
+  JOIN Person AS p
+    ON p.firstName = pw.personFirstName
+   AND p.lastName  = pw.personLastName
+   AND p.birthDate = pw.personBirthDate
+  JOIN Movie AS m
+    ON m.title       = pw.movieTitle
+   AND m.releaseDate = pw.movieReleaseDate
+   SET pw.personId = p.personId,
+       pw.movieId  = m.movieId;
+
+ALTER TABLE PersonWorkedOnMovie
+  MODIFY personId INT UNSIGNED NOT NULL,
+  MODIFY movieId  INT UNSIGNED NOT NULL,
+  ADD INDEX idx_pw_person (personId),
+  ADD INDEX idx_pw_movie (movieId),
+  ADD CONSTRAINT fk_pw_person FOREIGN KEY (personId) REFERENCES Person (personId),
+  ADD CONSTRAINT fk_pw_movie  FOREIGN KEY (movieId)  REFERENCES Movie (movieId);
+
+CREATE TRIGGER trg_pw_ids BEFORE INSERT ON PersonWorkedOnMovie FOR EACH ROW
+  SET NEW.personId = COALESCE(NEW.personId, (
+        SELECT personId FROM Person
+        WHERE firstName = NEW.personFirstName
+          AND lastName  = NEW.personLastName
+          AND birthDate = NEW.personBirthDate)),
+      NEW.movieId = COALESCE(NEW.movieId, (
+        SELECT movieId FROM Movie
+        WHERE title = NEW.movieTitle AND releaseDate = NEW.movieReleaseDate));
+
+-- UserNomination ----------------------------------------------------------
+
+ALTER TABLE UserNomination
+  ADD COLUMN personId INT UNSIGNED NULL AFTER userUsername,
+  ADD COLUMN movieId  INT UNSIGNED NULL AFTER personId;
+
+UPDATE UserNomination AS un
+  JOIN Person AS p
+    ON p.firstName = un.personFirstName
+   AND p.lastName  = un.personLastName
+   AND p.birthDate = un.personBirthDate
+  JOIN Movie AS m
+    ON m.title       = un.movieTitle
+   AND m.releaseDate = un.movieReleaseDate
+   SET un.personId = p.personId,
+       un.movieId  = m.movieId;
+
+ALTER TABLE UserNomination
+  MODIFY personId INT UNSIGNED NOT NULL,
+  MODIFY movieId  INT UNSIGNED NOT NULL,
+  DROP INDEX idx_un_category_movie,
+  DROP INDEX idx_un_year_movie,
+  ADD INDEX idx_un_user (userUsername, category),
+  ADD INDEX idx_un_category_movie (category, movieId),
+  ADD INDEX idx_un_year_movie (releaseYear, movieId),
+  ADD CONSTRAINT fk_un_person FOREIGN KEY (personId) REFERENCES Person (personId),
+  ADD CONSTRAINT fk_un_movie  FOREIGN KEY (movieId)  REFERENCES Movie (movieId);
+
+CREATE TRIGGER trg_un_ids BEFORE INSERT ON UserNomination FOR EACH ROW
+  SET NEW.personId = COALESCE(NEW.personId, (
+        SELECT personId FROM Person
+        WHERE firstName = NEW.personFirstName
+          AND lastName  = NEW.personLastName
+          AND birthDate = NEW.personBirthDate)),
+      NEW.movieId = COALESCE(NEW.movieId, (
+        SELECT movieId FROM Movie
+        WHERE title = NEW.movieTitle AND releaseDate = NEW.movieReleaseDate));
+
+-- MovieCountry / MovieProductionCompany -----------------------------------
+
+ALTER TABLE MovieCountry
+  ADD COLUMN movieId INT UNSIGNED NULL FIRST;
+
+UPDATE MovieCountry AS mc
+  JOIN Movie AS m
+    ON m.title       = mc.title
+   AND m.releaseDate = mc.releaseDate
+   SET mc.movieId = m.movieId;
+
+ALTER TABLE MovieCountry
+  MODIFY movieId INT UNSIGNED NOT NULL,
+  ADD INDEX idx_mc_movie (movieId),
+  ADD CONSTRAINT fk_mc_movie FOREIGN KEY (movieId) REFERENCES Movie (movieId);
+
+CREATE TRIGGER trg_mc_ids BEFORE INSERT ON MovieCountry FOR EACH ROW
+  SET NEW.movieId = COALESCE(NEW.movieId, (
+        SELECT movieId FROM Movie
+        WHERE title = NEW.title AND releaseDate = NEW.releaseDate));
+
+ALTER TABLE MovieProductionCompany
+  ADD COLUMN movieId INT UNSIGNED NULL FIRST;
+
+UPDATE MovieProductionCompany AS mpc
+  JOIN Movie AS m
+    ON m.title       = mpc.title
+   AND m.releaseDate = mpc.releaseDate
+   SET mpc.movieId = m.movieId;
+
+ALTER TABLE MovieProductionCompany
+  MODIFY movieId INT UNSIGNED NOT NULL,
+  ADD INDEX idx_mpc_movie (movieId, productionCompany),
+  ADD CONSTRAINT fk_mpc_movie FOREIGN KEY (movieId) REFERENCES Movie (movieId);
+
+CREATE TRIGGER trg_mpc_ids BEFORE INSERT ON MovieProductionCompany FOR EACH ROW
+  SET NEW.movieId = COALESCE(NEW.movieId, (
+        SELECT movieId FROM Movie
+        WHERE title = NEW.title AND releaseDate = NEW.releaseDate));
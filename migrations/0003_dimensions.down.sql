@@ -0,0 +1,56 @@
+DROP TRIGGER IF EXISTS trg_mpc_company;
+DROP TRIGGER IF EXISTS trg_mc_country;
+DROP TRIGGER IF EXISTS trg_person_country;
+DROP TRIGGER IF EXISTS trg_movie_language;
+DROP TRIGGER IF EXISTS trg_un_category;
+DROP TRIGGER IF EXISTS trg_an_category;
+
+ALTER TABLE MovieProductionCompany
+  DROP FOREIGN KEY fk_mpc_company,
+  DROP INDEX idx_mpc_movie,
+  ADD INDEX idx_mpc_movie (movieId, productionCompany);
+
+ALTER TABLE MovieProductionCompany
+  DROP INDEX fk_mpc_company,
+  DROP COLUMN companyId;
+
+ALTER TABLE MovieCountry
+  DROP FOREIGN KEY fk_mc_country,
+  DROP INDEX idx_mc_country,
+  DROP COLUMN countryId;
+
+ALTER TABLE Person
+  DROP FOREIGN KEY fk_person_country,
+  DROP INDEX idx_person_country,
+  ADD INDEX idx_person_country (countryOfBirth),
+  DROP COLUMN countryOfBirthId;
+
+ALTER TABLE Movie
+  DROP FOREIGN KEY fk_movie_language;
+
+ALTER TABLE Movie
+  DROP INDEX fk_movie_language,
+  DROP COLUMN languageId;
+
+ALTER TABLE UserNomination
+  DROP FOREIGN KEY fk_un_category,
+  DROP INDEX idx_un_user,
+  DROP INDEX idx_un_category_movie,
+  ADD INDEX idx_un_user (userUsername, category),
+  ADD INDEX idx_un_category_movie (category, movieId),
+  DROP COLUMN categoryId;
+
+ALTER TABLE AcademyNomination
+  DROP FOREIGN KEY fk_an_category,
+  DROP INDEX idx_an_category_granted_person,
+  DROP INDEX idx_an_person_category,
+  ADD INDEX idx_an_category_granted_person (category, grantedOrNot, personId),
+  ADD INDEX idx_an_person_category (personId, category),
+  DROP COLUMN categoryId;
+
+DROP TABLE IF EXISTS ProductionCompany;
+DROP TABLE IF EXISTS Country;
+DROP TABLE IF EXISTS Language;
+DROP TABLE IF EXISTS CategoryAlias;
+DROP TABLE IF EXISTS Category;
+DROP TABLE IF EXISTS Role;
@@ -0,0 +1,233 @@
+-- Dictionary-encoded dimensions for category, language, country and
+-- production company.
+--
+-- Each repeated free-text value gets a row in a small lookup table and
+-- the fact tables reference it by integer code, so the analytics views
+-- filter and group on ids instead of comparing long string lists. The
+-- original VARCHAR columns stay for the import scripts: BEFORE INSERT
+-- triggers look the codes up for rows inserted by name, and a name that
+-- has no dimension row yet is added by ingest.py (finish_load).
+
+-- Roles --------------------------------------------------------------------
+-- One row per dream-team slot. statsRole groups slots into the /stats
+-- pages (every acting slot counts towards "actor").
+
+CREATE TABLE Role (
+  roleId    TINYINT UNSIGNED NOT NULL PRIMARY KEY,
+  roleName  VARCHAR(30)      NOT NULL UNIQUE,
+  statsRole VARCHAR(30)      NULL,
+  INDEX idx_role_stats (statsRole)
+);
+
+INSERT INTO Role (roleId, roleName, statsRole) VALUES
+  (1, 'director',           'director'),
+  (2, 'actor',              'actor'),
+  (3, 'actress',            'actor'),
+  (4, 'supporting_actor',   'actor'),
+  (5, 'supporting_actress', 'actor'),
+  (6, 'producer',           NULL),
+  (7, 'singer',             'singer');
+
+-- Categories ---------------------------------------------------------------
+
+CREATE TABLE Category (
+  categoryId   SMALLINT UNSIGNED NOT NULL AUTO_INCREMENT PRIMARY KEY,
+  categoryName VARCHAR(50)       NOT NULL UNIQUE,
+  roleId       TINYINT UNSIGNED  NULL,
+  INDEX idx_category_role (roleId),
+  CONSTRAINT fk_category_role FOREIGN KEY (roleId) REFERENCES Role (roleId)
+);
+
+INSERT INTO Category (categoryName)
+  SELECT category FROM AcademyNomination
+  UNION
+  SELECT category FROM UserNomination
+  ORDER BY 1;
+
+INSERT IGNORE INTO Category (categoryName) VALUES
+  ('Best Picture'),
+  ('Best Production Design');
+
+UPDATE Category SET roleId = 1
+ WHERE categoryName IN ('Best Director', 'Best Directing',
+                        'Best Directing (Comedy Picture)',
+                        'Best Directing (Dramatic Picture)');
+UPDATE Category SET roleId = 2
+ WHERE categoryName IN ('Best Actor', 'Best Actor in a Leading Role');
+UPDATE Category SET roleId = 3
+ WHERE categoryName IN ('Best Actress', 'Best Actress in a Leading Role');
+UPDATE Category SET roleId = 4
+ WHERE categoryName = 'Best Actor in a Supporting Role';
+UPDATE Category SET roleId = 5
+ WHERE categoryName = 'Best Actress in a Supporting Role';
+UPDATE Category SET roleId = 6
+ WHERE categoryName = 'Best Picture';
+-- Category names are cut at 50 characters on import, so the longer music
+-- categories only match by prefix.
+UPDATE Category SET roleId = 7
+ WHERE categoryName LIKE 'Best Music (%';
+
+-- Wikipedia's heading for a category -> the category it is stored as.
+-- Read by the crawler in place of its old hard-coded mapping.
+CREATE TABLE CategoryAlias (
+  alias      VARCHAR(100)      NOT NULL PRIMARY KEY,
+  categoryId SMALLINT UNSIGNED NOT NULL,
+  CONSTRAINT fk_alias_category FOREIGN KEY (categoryId) REFERENCES Category (categoryId)
+);
+
+INSERT INTO CategoryAlias (alias, categoryId)
+  SELECT a.alias, c.categoryId
+  FROM (
+    SELECT 'Outstanding Picture' AS alias, 'Best Picture' AS name
+    UNION ALL SELECT 'Outstanding Production',     'Best Picture'
+    UNION ALL SELECT 'Outstanding Motion Picture', 'Best Picture'
+    UNION ALL SELECT 'Best Motion Picture',        'Best Picture'
+    UNION ALL SELECT 'Best Picture',               'Best Picture'
+    UNION ALL SELECT 'Best Art Direction',         'Best Production Design'
+    UNION ALL SELECT 'Best Production Design',     'Best Production Design'
+  ) AS a
+  JOIN Category AS c ON c.categoryName = a.name;
+
+ALTER TABLE AcademyNomination
+  ADD COLUMN categoryId SMALLINT UNSIGNED NULL AFTER category;
+
+UPDATE AcademyNomination AS an
+  JOIN Category AS c ON c.categoryName = an.category
+   SET an.categoryId = c.categoryId;
+
+ALTER TABLE AcademyNomination
+  DROP INDEX idx_an_category_granted_person,
+  DROP INDEX idx_an_person_category,
+  ADD INDEX idx_an_category_granted_person (categoryId, grantedOrNot, personId),
+  ADD INDEX idx_an_person_category (personId, categoryId),
+  ADD CONSTRAINT fk_an_category FOREIGN KEY (categoryId) REFERENCES Category (categoryId);
+
+CREATE TRIGGER trg_an_category BEFORE INSERT ON AcademyNomination FOR EACH ROW
+  SET NEW.categoryId = COALESCE(NEW.categoryId, (
+        SELECT categoryId FROM Category WHERE categoryName = NEW.category));
+
+ALTER TABLE UserNomination
+  ADD COLUMN categoryId SMALLINT UNSIGNED NULL AFTER category;
+
+UPDATE UserNomination AS un
+  JOIN Category AS c ON c.categoryName = un.category
+   SET un.categoryId = c.categoryId;
+
+ALTER TABLE UserNomination
+  DROP INDEX idx_un_user,
+  DROP INDEX idx_un_category_movie,
+  ADD INDEX idx_un_user (userUsername, categoryId),
+  ADD INDEX idx_un_category_movie (categoryId, movieId),
+  ADD CONSTRAINT fk_un_category FOREIGN KEY (categoryId) REFERENCES Category (categoryId);
+
+CREATE TRIGGER trg_un_category BEFORE INSERT ON UserNomination FOR EACH ROW
+  SET NEW.categoryId = COALESCE(NEW.categoryId, (
+        SELECT categoryId FROM Category WHERE categoryName = NEW.category));
+
+-- Languages ----------------------------------------------------------------
+-- isKnown is 0 for the placeholders the cleaning scripts left behind
+-- ('', 'nan', 'No'), which are neither English nor a foreign language.
+
+CREATE TABLE Language (
+  languageId   SMALLINT UNSIGNED NOT NULL AUTO_INCREMENT PRIMARY KEY,
+  languageName VARCHAR(50)       NOT NULL UNIQUE,
+  isEnglish    TINYINT(1)        NOT NULL DEFAULT 0,
+  isKnown      TINYINT(1)        NOT NULL DEFAULT 1
+);
+
+INSERT INTO Language (languageName)
+  SELECT DISTINCT movieLanguage FROM Movie
+  WHERE movieLanguage IS NOT NULL
+  ORDER BY 1;
+
+UPDATE Language SET isEnglish = 1 WHERE languageName = 'English';
+UPDATE Language SET isKnown = 0 WHERE languageName IN ('', 'nan', 'No');
+
+ALTER TABLE Movie
+  ADD COLUMN languageId SMALLINT UNSIGNED NULL AFTER movieLanguage;
+
+UPDATE Movie AS m
+  JOIN Language AS l ON l.languageName = m.movieLanguage
+   SET m.languageId = l.languageId;
+
+ALTER TABLE Movie
+  ADD CONSTRAINT fk_movie_language FOREIGN KEY (languageId) REFERENCES Language (languageId);
+
+CREATE TRIGGER trg_movie_language BEFORE INSERT ON Movie FOR EACH ROW
+  SET NEW.languageId = COALESCE(NEW.languageId, (
+        SELECT languageId FROM Language WHERE languageName = NEW.movieLanguage));
+
+-- Countries ----------------------------------------------------------------
+-- Shared by birth countries and production countries. Empty strings get
+-- no row, so Person.countryOfBirthId is NULL when the country is unknown.
+
+CREATE TABLE Country (
+  countryId   SMALLINT UNSIGNED NOT NULL AUTO_INCREMENT PRIMARY KEY,
+  countryName VARCHAR(100)      NOT NULL UNIQUE
+);
+
+INSERT INTO Country (countryName)
+  SELECT countryOfBirth FROM Person
+  WHERE countryOfBirth IS NOT NULL AND countryOfBirth <> ''
+  UNION
+  SELECT country FROM MovieCountry
+  WHERE country <> ''
+  ORDER BY 1;
+
+ALTER TABLE Person
+  ADD COLUMN countryOfBirthId SMALLINT UNSIGNED NULL AFTER countryOfBirth;
+
+UPDATE Person AS p
+  JOIN Country AS c ON c.countryName = p.countryOfBirth
+   SET p.countryOfBirthId = c.countryId;
+
+ALTER TABLE Person
+  DROP INDEX idx_person_country,
+  ADD INDEX idx_person_country (countryOfBirthId),
+  ADD CONSTRAINT fk_person_country FOREIGN KEY (countryOfBirthId) REFERENCES Country (countryId);
+
+CREATE TRIGGER trg_person_country BEFORE INSERT ON Person FOR EACH ROW
+  SET NEW.countryOfBirthId = COALESCE(NEW.countryOfBirthId, (
+        SELECT countryId FROM Country WHERE countryName = NEW.countryOfBirth));
+
+ALTER TABLE MovieCountry
+  ADD COLUMN countryId SMALLINT UNSIGNED NULL AFTER country;
+
+UPDATE MovieCountry AS mc
+  JOIN Country AS c ON c.countryName = mc.country
+   SET mc.countryId = c.countryId;
+
+ALTER TABLE MovieCountry
+  ADD INDEX idx_mc_country (countryId, movieId),
+  ADD CONSTRAINT fk_mc_country FOREIGN KEY (countryId) REFERENCES Country (countryId);
+
+CREATE TRIGGER trg_mc_country BEFORE INSERT ON MovieCountry FOR EACH ROW
+  SET NEW.countryId = COALESCE(NEW.countryId, (
+        SELECT countryId FROM Country WHERE countryName = NEW.country));
+
+-- Production companies -----------------------------------------------------
+
+CREATE TABLE ProductionCompany (
+  companyId   INT UNSIGNED NOT NULL AUTO_INCREMENT PRIMARY KEY,
+  companyName VARCHAR(100) NOT NULL UNIQUE
+);
+
+INSERT INTO ProductionCompany (companyName)
+  SELECT DISTINCT productionCompany FROM MovieProductionCompany
+  ORDER BY 1;
+
+ALTER TABLE MovieProductionCompany
+  ADD COLUMN companyId INT UNSIGNED NULL AFTER productionCompany;
+
+UPDATE MovieProductionCompany AS mpc
+  JOIN ProductionCompany AS pc ON pc.companyName = mpc.productionCompany
+   SET mpc.companyId = pc.companyId;
+
+ALTER TABLE MovieProductionCompany
+  DROP INDEX idx_mpc_movie,
+  ADD INDEX idx_mpc_movie (movieId, companyId),
+  ADD CONSTRAINT fk_mpc_company FOREIGN KEY (companyId) REFERENCES ProductionCompany (companyId);
+
+CREATE TRIGGER trg_mpc_company BEFORE INSERT ON MovieProductionCompany FOR EACH ROW
+  SET NEW.companyId = COALESCE(NEW.companyId, (
+        SELECT companyId FROM ProductionCompany WHERE companyName = NEW.productionCompany));
@@ -0,0 +1,66 @@
+-- Back to the unpartitioned table of 0003. Its primary key has no
+-- season, so a vote repeated in a later season keeps only one row.
+
+DROP TRIGGER IF EXISTS trg_un_ids;
+
+CREATE TABLE UserNominationUnpartitioned (
+  userUsername     VARCHAR(50)       NOT NULL,
+  personId         INT UNSIGNED      NOT NULL,
+  movieId          INT UNSIGNED      NOT NULL,
+  personFirstName  VARCHAR(100)      NOT NULL,
+  personLastName   VARCHAR(100)      NOT NULL,
+  personBirthDate  DATE              NOT NULL,
+  movieTitle       VARCHAR(255)      NOT NULL,
+  movieReleaseDate DATE              NOT NULL,
+  category         VARCHAR(50)       NOT NULL,
+  categoryId       SMALLINT UNSIGNED NULL,
+  iteration        INT               DEFAULT NULL,
+  grantedOrNot     TINYINT(1)        DEFAULT NULL,
+  releaseYear      SMALLINT AS (YEAR(movieReleaseDate)) STORED,
+  PRIMARY KEY (userUsername, personFirstName, personLastName, personBirthDate,
+               movieTitle, movieReleaseDate, category),
+  KEY personFirstName (personFirstName, personLastName, personBirthDate),
+  KEY movieTitle (movieTitle, movieReleaseDate),
+  INDEX idx_un_user (userUsername, categoryId),
+  INDEX idx_un_category_movie (categoryId, movieId),
+  INDEX idx_un_year_movie (releaseYear, movieId),
+  CONSTRAINT usernomination_ibfk_1 FOREIGN KEY (userUsername) REFERENCES Users (username),
+  CONSTRAINT usernomination_ibfk_2 FOREIGN KEY (personFirstName, personLastName, personBirthDate)
+    REFERENCES Person (firstName, lastName, birthDate),
+  CONSTRAINT usernomination_ibfk_3 FOREIGN KEY (movieTitle, movieReleaseDate)
+    REFERENCES Movie (title, releaseDate),
+  CONSTRAINT fk_un_person   FOREIGN KEY (personId)   REFERENCES Person (personId),
+  CONSTRAINT fk_un_movie    FOREIGN KEY (movieId)    REFERENCES Movie (movieId),
+  CONSTRAINT fk_un_category FOREIGN KEY (categoryId) REFERENCES Category (categoryId)
+);
+
+INSERT IGNORE INTO UserNominationUnpartitioned
+  (userUsername, personId, movieId,
+   personFirstName, personLastName, personBirthDate,
+   movieTitle, movieReleaseDate, category, categoryId, iteration, grantedOrNot)
+SELECT
+  userUsername, personId, movieId,
+  personFirstName, personLastName, personBirthDate,
+  movieTitle, movieReleaseDate, category, categoryId, iteration, grantedOrNot
+FROM UserNomination
+ORDER BY season DESC;
+
+RENAME TABLE
+  UserNomination TO UserNominationPartitioned,
+  UserNominationUnpartitioned TO UserNomination;
+
+DROP TABLE UserNominationPartitioned;
+
+CREATE TRIGGER trg_un_ids BEFORE INSERT ON UserNomination FOR EACH ROW
+  SET NEW.personId = COALESCE(NEW.personId, (
+        SELECT personId FROM Person
+        WHERE firstName = NEW.personFirstName
+          AND lastName  = NEW.personLastName
+          AND birthDate = NEW.personBirthDate)),
+      NEW.movieId = COALESCE(NEW.movieId, (
+        SELECT movieId FROM Movie
+        WHERE title = NEW.movieTitle AND releaseDate = NEW.movieReleaseDate));
+
+CREATE TRIGGER trg_un_category BEFORE INSERT ON UserNomination FOR EACH ROW
+  SET NEW.categoryId = COALESCE(NEW.categoryId, (
+        SELECT categoryId FROM Category WHERE categoryName = NEW.category));
@@ -0,0 +1,81 @@
+-- Rebuild UserNomination as a partitioned table.
+--
+-- Rows are partitioned by season (the ceremony year a vote counts
+-- towards) and subpartitioned by a hash of the user, so
+--   * /top_nominated, which filters on one season, reads one partition;
+--   * /nominations, which filters on one user, reads one subpartition of
+--     each season;
+--   * an old season is archived or dropped with DROP PARTITION instead
+--     of a large DELETE (see seasons.py).
+--
+-- The seven-column VARCHAR primary key is replaced by the integer ids.
+-- Partitioned InnoDB tables cannot have foreign keys, so the per-table
+-- FKs go away; nomination_insert only inserts ids it has just selected
+-- from Person/Movie/Category. Existing rows get the season of their
+-- ceremony (iteration 1 was the 1929 ceremony).
+
+DROP TRIGGER IF EXISTS trg_un_ids;
+DROP TRIGGER IF EXISTS trg_un_category;
+
+CREATE TABLE UserNominationPartitioned (
+  userUsername     VARCHAR(50)       NOT NULL,
+  season           SMALLINT          NOT NULL,
+  categoryId       SMALLINT UNSIGNED NOT NULL,
+  personId         INT UNSIGNED      NOT NULL,
+  movieId          INT UNSIGNED      NOT NULL,
+  nominatedAt      DATETIME          NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  personFirstName  VARCHAR(100)      NOT NULL,
+  personLastName   VARCHAR(100)      NOT NULL,
+  personBirthDate  DATE              NOT NULL,
+  movieTitle       VARCHAR(255)      NOT NULL,
+  movieReleaseDate DATE              NOT NULL,
+  category         VARCHAR(50)       NOT NULL,
+  iteration        INT               DEFAULT NULL,
+  grantedOrNot     TINYINT(1)        DEFAULT NULL,
+  releaseYear      SMALLINT AS (YEAR(movieReleaseDate)) STORED,
+  PRIMARY KEY (userUsername, season, categoryId, personId, movieId),
+  INDEX idx_un_category_movie (season, categoryId, movieId),
+  INDEX idx_un_year_movie (season, releaseYear, movieId)
+)
+PARTITION BY RANGE (season)
+SUBPARTITION BY KEY (userUsername) SUBPARTITIONS 8 (
+  -- Every season before the app's first live one (the historical votes
+  -- copied below sit at 1928 + iteration); never dropped by seasons.py.
+  PARTITION pold  VALUES LESS THAN (2024),
+  PARTITION p2024 VALUES LESS THAN (2025),
+  PARTITION p2025 VALUES LESS THAN (2026),
+  PARTITION p2026 VALUES LESS THAN (2027),
+  PARTITION p2027 VALUES LESS THAN (2028),
+  PARTITION pmax  VALUES LESS THAN MAXVALUE
+);
+
+INSERT INTO UserNominationPartitioned
+  (userUsername, season, categoryId, personId, movieId,
+   personFirstName, personLastName, personBirthDate,
+   movieTitle, movieReleaseDate, category, iteration, grantedOrNot)
+SELECT
+  userUsername, COALESCE(1928 + iteration, YEAR(CURRENT_DATE)),
+  categoryId, personId, movieId,
+  personFirstName, personLastName, personBirthDate,
+  movieTitle, movieReleaseDate, category, iteration, grantedOrNot
+FROM UserNomination;
+
+RENAME TABLE
+  UserNomination TO UserNominationUnpartitioned,
+  UserNominationPartitioned TO UserNomination;
+
+DROP TABLE UserNominationUnpartitioned;
+
+-- Rows inserted by name (the CSV import) get their ids and season here.
+CREATE TRIGGER trg_un_ids BEFORE INSERT ON UserNomination FOR EACH ROW
+  SET NEW.personId = COALESCE(NEW.personId, (
+        SELECT personId FROM Person
+        WHERE firstName = NEW.personFirstName
+          AND lastName  = NEW.personLastName
+          AND birthDate = NEW.personBirthDate)),
+      NEW.movieId = COALESCE(NEW.movieId, (
+        SELECT movieId FROM Movie
+        WHERE title = NEW.movieTitle AND releaseDate = NEW.movieReleaseDate)),
+      NEW.categoryId = COALESCE(NEW.categoryId, (
+        SELECT categoryId FROM Category WHERE categoryName = NEW.category)),
+      NEW.season = COALESCE(NEW.season, 1928 + NEW.iteration, YEAR(NEW.nominatedAt));
@@ -0,0 +1,10 @@
+-- A single counter that ingest.finish_load bumps after every import.
+-- cache.py polls it and drops cached reference data when it moves.
+
+CREATE TABLE DataVersion (
+  id        TINYINT UNSIGNED NOT NULL PRIMARY KEY,
+  version   BIGINT UNSIGNED  NOT NULL,
+  updatedAt DATETIME         NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT INTO DataVersion (id, version) VALUES (1, 1);
@@ -0,0 +1,3 @@
+DROP TABLE IF EXISTS NonEnglishWinner;
+DROP TABLE IF EXISTS CountryGroupTotals;
+DROP TABLE IF EXISTS CompanyWins;
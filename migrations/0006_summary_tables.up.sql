@@ -0,0 +1,64 @@
+-- Materialized results for the leaderboards that only change on import.
+--
+-- /top_companies, /top_actor_countries and /non_english_winners used to
+-- join and aggregate AcademyNomination on every request. These tables
+-- hold the finished rows instead, each with an index matching the
+-- view's ORDER BY, so the views read a handful of index entries.
+-- ingest.refresh_summaries rebuilds them in the import's transaction;
+-- the rows below are the same queries run once for the current data.
+
+CREATE TABLE CompanyWins (
+  companyId   INT UNSIGNED NOT NULL PRIMARY KEY,
+  companyName VARCHAR(100) NOT NULL,
+  wins        INT UNSIGNED NOT NULL,
+  INDEX idx_cw_wins (wins DESC)
+);
+
+-- groupName names a set of roles the app reports on together
+-- ("best_actor" = actor + supporting_actor).
+CREATE TABLE CountryGroupTotals (
+  groupName   VARCHAR(30)       NOT NULL,
+  countryId   SMALLINT UNSIGNED NOT NULL,
+  countryName VARCHAR(100)      NOT NULL,
+  wins        INT UNSIGNED      NOT NULL,
+  nominations INT UNSIGNED      NOT NULL,
+  PRIMARY KEY (groupName, countryId),
+  INDEX idx_cgt_wins (groupName, wins DESC),
+  INDEX idx_cgt_nominations (groupName, nominations DESC)
+);
+
+CREATE TABLE NonEnglishWinner (
+  movieId      INT UNSIGNED NOT NULL PRIMARY KEY,
+  title        VARCHAR(255) NOT NULL,
+  year         SMALLINT     NULL,
+  languageName VARCHAR(50)  NOT NULL,
+  INDEX idx_new_year_title (year DESC, title)
+);
+
+INSERT INTO CompanyWins (companyId, companyName, wins)
+SELECT pc.companyId, pc.companyName, COUNT(*)
+FROM AcademyNomination AS an
+JOIN MovieProductionCompany AS mpc ON mpc.movieId = an.movieId
+JOIN ProductionCompany AS pc ON pc.companyId = mpc.companyId
+WHERE an.grantedOrNot = 1
+GROUP BY pc.companyId, pc.companyName;
+
+INSERT INTO CountryGroupTotals (groupName, countryId, countryName, wins, nominations)
+SELECT 'best_actor', co.countryId, co.countryName,
+       SUM(an.grantedOrNot = 1), COUNT(*)
+FROM AcademyNomination AS an
+JOIN Category AS c  ON c.categoryId = an.categoryId
+JOIN Role     AS r  ON r.roleId     = c.roleId
+JOIN Person   AS p  ON p.personId   = an.personId
+JOIN Country  AS co ON co.countryId = p.countryOfBirthId
+WHERE r.roleName IN ('actor', 'supporting_actor')
+GROUP BY co.countryId, co.countryName;
+
+INSERT INTO NonEnglishWinner (movieId, title, year, languageName)
+SELECT DISTINCT m.movieId, m.title, YEAR(m.releaseDate), l.languageName
+FROM AcademyNomination AS an
+JOIN Movie AS m ON m.movieId = an.movieId
+JOIN Language AS l ON l.languageId = m.languageId
+WHERE an.grantedOrNot = 1
+  AND l.isEnglish = 0
+  AND l.isKnown   = 1;
@@ -0,0 +1,213 @@
+"""
+Pre-rendered copies of the pages that only depend on the Oscar tables.
+
+    python prerender.py            # render every page for the current data
+
+The build renders each dataset-only page through the app itself -
+including every /staff_by_country country and every /stats/<role>
+person - and writes it, with .gz (and .br, when the brotli package is
+installed) variants, into a new directory PRERENDER_DIR/<data
+version>-<build time>/. The CURRENT file is then switched to it in one
+rename, so a worker always finds a complete build, and older builds are
+pruned. ingest.py runs the build after each load.
+
+With PRERENDER=1 the views decorated with ``@prerendered`` answer
+straight from those files, so logged-in users get them without running
+any of the page's queries. The only database access left is cache.py's
+throttled data-version poll: a build is served only while it matches
+the live version, so a load whose build has not finished yet (or a
+page missing from the build, or a pending flash message) falls through
+to the normal view.
+"""
+import os
+import sys
+import gzip
+import time
+import shutil
+from functools import wraps
+from flask import request, session, make_response
+from werkzeug.security import safe_join
+import cache
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+SERVE = os.getenv("PRERENDER") == "1"
+PRERENDER_DIR = os.getenv(
+    "PRERENDER_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "prerendered")
+)
+KEEP_BUILDS = 2
+
+# CURRENT is re-read only when its mtime changes.
+_current = (None, None)   # (mtime, build directory name)
+_building = False
+
+
+def _current_build():
+    global _current
+    path = os.path.join(PRERENDER_DIR, "CURRENT")
+    try:
+        mtime = os.stat(path).st_mtime
+    except OSError:
+        return None
+    if _current[0] != mtime:
+        with open(path) as f:
+            _current = (mtime, f.read().strip())
+    return _current[1]
+
+
+def _page_path(path, field=None, value=None):
+    """File for a GET of ``path``, or for a POST of ``field=value`` to it."""
+    name = f"{field}-{value}.html" if field else "index.html"
+    return path.strip("/") + "/" + name
+
+
+def _encoded(filename):
+    """(file, Content-Encoding) to send, honouring Accept-Encoding."""
+    if brotli is not None and request.accept_encodings["br"] and os.path.exists(filename + ".br"):
+        return filename + ".br", "br"
+    if request.accept_encodings["gzip"] and os.path.exists(filename + ".gz"):
+        return filename + ".gz", "gzip"
+    return filename, None
+
+
+def prerendered(field=None):
+    """
+    Serve the view's pre-rendered copy when PRERENDER=1. ``field`` names
+    the form input a POST selects a page by (e.g. "country"); its value
+    must be an id.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapped(**kwargs):
+            if not SERVE or _building or session.get("_flashes"):
+                return view(**kwargs)
+            if request.method == "POST":
+                value = request.form.get(field or "", "")
+                if not field or not value.isdigit():
+                    return view(**kwargs)
+                page = _page_path(request.path, field, value)
+            elif request.method in ("GET", "HEAD"):
+                page = _page_path(request.path)
+            else:
+                return view(**kwargs)
+            name = _current_build()
+            if name is None or name.split("-")[0] != str(cache.data_version()):
+                return view(**kwargs)
+            filename = safe_join(PRERENDER_DIR, name, page)
+            if not filename or not os.path.exists(filename):
+                return view(**kwargs)
+
+            filename, encoding = _encoded(filename)
+            with open(filename, "rb") as f:
+                response = make_response(f.read())
+            response.mimetype = "text/html"
+            if encoding:
+                response.headers["Content-Encoding"] = encoding
+            response.vary.update(("Accept-Encoding", "Cookie"))
+            response.headers["Cache-Control"] = "private, max-age=60, must-revalidate"
+            response.set_etag(f"{name}-{page}-{encoding or 'identity'}")
+            return response.make_conditional(request)
+        return wrapped
+    return decorator
+
+
+# ---- build -----------------------------------------------------------------
+
+def _pages(queries):
+    """(path, form data or None) for every page to render."""
+    pages = [
+        ("/top_companies", None),
+        ("/non_english_winners", None),
+        ("/top_actor_countries", None),
+        ("/dream_team", None),
+        ("/staff_by_country", None),
+    ]
+    for country_id, _ in queries.fetchall("birth_countries"):
+        pages.append(("/staff_by_country", {"country": country_id}))
+    for (role,) in queries.fetchall("stats_roles"):
+        pages.append((f"/stats/{role}", None))
+        for person_id, _ in queries.fetchall("stats_persons", (role,)):
+            pages.append((f"/stats/{role}", {"person": person_id}))
+    return pages
+
+
+def _write(filename, body):
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    with open(filename, "wb") as f:
+        f.write(body)
+    with open(filename + ".gz", "wb") as f:
+        f.write(gzip.compress(body, 9))
+    if brotli is not None:
+        with open(filename + ".br", "wb") as f:
+            f.write(brotli.compress(body, quality=11))
+
+
+def build():
+    """Render every page for the current data version; returns the page count."""
+    global _building
+    from app import app
+    import queries
+
+    _building = True
+    try:
+        with app.app_context():
+            cache.clear()
+            cache._polled_at = 0
+            version = cache.data_version()
+            if version is None:
+                raise RuntimeError("Could not read the data version")
+            version = str(version)
+            pages = _pages(queries)
+
+        name = f"{version}-{time.time_ns()}"
+        staging = os.path.join(PRERENDER_DIR, f".{name}.{os.getpid()}")
+        client = app.test_client()
+        with client.session_transaction() as s:
+            s["username"] = "prerender"
+        for path, form in pages:
+            if form is None:
+                response = client.get(path)
+                page = _page_path(path)
+            else:
+                response = client.post(path, data=form)
+                (field, value), = form.items()
+                page = _page_path(path, field, value)
+            if response.status_code != 200 or response.headers.get("X-Stale"):
+                raise RuntimeError(f"{path} {form or ''}: {response.status}")
+            _write(os.path.join(staging, page), response.get_data())
+    finally:
+        _building = False
+
+    # A fresh directory, never one a worker may be reading from.
+    os.replace(staging, os.path.join(PRERENDER_DIR, name))
+    tmp = os.path.join(PRERENDER_DIR, f"CURRENT.{os.getpid()}.tmp")
+    with open(tmp, "w") as f:
+        f.write(name)
+    os.replace(tmp, os.path.join(PRERENDER_DIR, "CURRENT"))
+    _prune(name)
+    return len(pages)
+
+
+def _prune(current):
+    builds = sorted(
+        (name for name in os.listdir(PRERENDER_DIR)
+         if name.replace("-", "", 1).isdigit() and not name.startswith("-")),
+        key=lambda name: tuple(int(part) for part in name.split("-"))
+    )
+    for name in builds[:-KEEP_BUILDS]:
+        if name != current:
+            shutil.rmtree(os.path.join(PRERENDER_DIR, name), ignore_errors=True)
+
+
+def main():
+    count = build()
+    print(f"Pre-rendered {count} pages into {PRERENDER_DIR}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
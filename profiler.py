@@ -0,0 +1,117 @@
+"""
+Opt-in sampling profiler for single requests.
+
+Send ``X-Profile: <PROFILE_TOKEN>`` (a header only, so the token stays
+out of access logs) and the request's thread is sampled every
+PROFILE_INTERVAL_MS by a background thread. The result is written to
+PROFILE_DIR in collapsed stack format (one ``frame;frame;frame count``
+line per stack), which flamegraph.pl, speedscope and inferno all read. While a statement from
+queries.py is running, samples get an extra ``sql:<name>`` frame on top
+so SQL time stands out from fetching and template rendering.
+
+With no token configured, or without the header, the only cost is one
+dict lookup per request and per statement.
+"""
+import os
+import sys
+import hmac
+import time
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from flask import g, request
+
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN")
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+INTERVAL = float(os.getenv("PROFILE_INTERVAL_MS", 1)) / 1000
+
+# thread id -> active session, for threads currently being profiled
+_sessions = {}
+
+
+class _Session:
+    def __init__(self, thread_id):
+        self.thread_id = thread_id
+        self.samples = Counter()
+        self.span = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(INTERVAL):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(
+                    f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+                )
+                frame = frame.f_back
+            stack.reverse()
+            if self.span:
+                stack.append(self.span)
+            self.samples[";".join(stack)] += 1
+
+    def write(self, label):
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{label}-{os.getpid()}.folded"
+        path = os.path.join(PROFILE_DIR, name)
+        with open(path, "w") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+        return path
+
+
+@contextmanager
+def sql_span(name):
+    """Tag samples taken while ``name`` runs; free when not profiling."""
+    session = _sessions.get(threading.get_ident()) if _sessions else None
+    if session is None:
+        yield
+        return
+    session.span = f"sql:{name}"
+    try:
+        yield
+    finally:
+        session.span = None
+
+
+def _requested():
+    supplied = request.headers.get("X-Profile")
+    if supplied is None:
+        return False
+    return hmac.compare_digest(supplied.encode(), PROFILE_TOKEN.encode())
+
+
+def _start():
+    if not PROFILE_TOKEN or not _requested():
+        return
+    session = _Session(threading.get_ident())
+    _sessions[session.thread_id] = session
+    g.profile_session = session
+    session.start()
+
+
+def _stop(e=None):
+    session = g.pop("profile_session", None)
+    if session is None:
+        return
+    session.stop()
+    _sessions.pop(session.thread_id, None)
+    label = (request.endpoint or "unknown").replace("/", "_")
+    session.write(label)
+
+
+def init_app(app):
+    # Registered first so the sampler also covers the other hooks.
+    app.before_request_funcs.setdefault(None, []).insert(0, _start)
+    app.teardown_request(_stop)
@@ -0,0 +1,415 @@
+"""
+Every SQL statement the app runs, by name.
+
+Each statement is prepared server-side the first time a pooled
+connection runs it and the prepared handle is kept on that connection,
+so later requests skip the parse/plan step. Views call ``fetchall`` /
+``fetchone`` / ``execute`` with a name instead of building SQL.
+
+Statements over reference data (tables only the import scripts write)
+carry a ``ttl`` and are answered from cache.py when possible; the ones
+in snapshot.TABLES are read from the shared snapshot file instead.
+With ANALYTICS_BACKEND=sqlite the rest of them run in-process on the
+embedded copy from analytics.py.
+"""
+import os
+import time
+from db import get_db, raw_connection, apply_budget
+import metrics
+import profiler
+import guard
+import cache
+import snapshot
+import analytics
+
+
+class Statement:
+    """
+    ``bound`` holds trailing parameters fixed at definition time (such as
+    a list of role names), appended after whatever the caller passes.
+    ``ttl`` (seconds) makes the result cacheable; leave it unset for
+    anything that reads tables the app itself writes. Statements with a
+    ttl may also run on the embedded backend (analytics.py); ``sqlite``
+    is their SQLite text where the MySQL one does not carry over.
+    """
+
+    def __init__(self, sql, readonly=True, bound=(), ttl=None, sqlite=None):
+        self.sql = sql
+        self.readonly = readonly
+        self.bound = tuple(bound)
+        self.ttl = ttl
+        self.sqlite = sqlite
+
+
+def _placeholders(values):
+    return ", ".join("%s" for _ in values)
+
+
+# How long reference-data results are cached. A new import invalidates
+# them anyway (see cache.py), so this only bounds memory held by rarely
+# used entries.
+REFERENCE_TTL = int(os.getenv("QUERY_CACHE_TTL", 600))
+
+# Dream-team slots whose wins count as "Best Actor" on /top_actor_countries,
+# summed up under this group name in CountryGroupTotals.
+BEST_ACTOR_ROLES = ["actor", "supporting_actor"]
+BEST_ACTOR_GROUP = "best_actor"
+
+
+STATEMENTS = {
+    "movie_count": Statement("SELECT COUNT(*) FROM Movie", ttl=REFERENCE_TTL),
+
+    "user_taken": Statement(
+        "SELECT 1 FROM Users WHERE username=%s OR email=%s",
+        readonly=False
+    ),
+    "user_insert": Statement("""
+        INSERT INTO Users
+          (username, email, gender, age, birthDate, country)
+        VALUES (%s, %s, %s, %s, %s, %s)
+    """, readonly=False),
+    "user_exists": Statement("SELECT username FROM Users WHERE username=%s"),
+
+    # Copies the natural-key columns from the chosen person, movie and
+    # category; inserts nothing (rowcount 0) if any id does not exist.
+    "nomination_insert": Statement("""
+        INSERT INTO UserNomination
+          (userUsername, season,
+           personId, personFirstName, personLastName, personBirthDate,
+           movieId, movieTitle, movieReleaseDate,
+           categoryId, category)
+        SELECT
+          %s, %s,
+          p.personId, p.firstName, p.lastName, p.birthDate,
+          m.movieId, m.title, m.releaseDate,
+          c.categoryId, c.categoryName
+        FROM Person AS p
+        JOIN Movie    AS m
+        JOIN Category AS c
+        WHERE p.personId   = %s
+          AND m.movieId    = %s
+          AND c.categoryId = %s
+    """, readonly=False),
+    "nominate_persons": Statement("""
+        SELECT
+          personId,
+          CONCAT(firstName, ' ', lastName, ' (', birthDate, ')') AS person_label
+        FROM Person
+        ORDER BY lastName, firstName
+    """, ttl=REFERENCE_TTL, sqlite="""
+        SELECT
+          personId,
+          firstName || ' ' || lastName || ' (' || birthDate || ')' AS person_label
+        FROM Person
+        ORDER BY lastName, firstName
+    """),
+    "nominate_movies": Statement("""
+        SELECT
+          movieId,
+          CONCAT(Title, ' (', releaseDate, ')') AS movie_label
+        FROM Movie
+        ORDER BY Title
+    """, ttl=REFERENCE_TTL, sqlite="""
+        SELECT
+          movieId,
+          title || ' (' || releaseDate || ')' AS movie_label
+        FROM Movie
+        ORDER BY title
+    """),
+    "nominate_categories": Statement("""
+        SELECT c.categoryId, c.categoryName
+        FROM Category AS c
+        WHERE EXISTS (
+          SELECT 1 FROM AcademyNomination AS an
+          WHERE an.categoryId = c.categoryId
+        )
+        ORDER BY c.categoryName
+    """, ttl=REFERENCE_TTL),
+
+    "user_nominations": Statement("""
+        SELECT
+          un.season,
+          c.categoryName,
+          m.Title,
+          CONCAT(p.firstName, ' ', p.lastName) AS person
+        FROM UserNomination AS un
+        JOIN Category AS c ON c.categoryId = un.categoryId
+        JOIN Movie    AS m ON m.movieId    = un.movieId
+        JOIN Person   AS p ON p.personId   = un.personId
+        WHERE un.userUsername = %s
+        ORDER BY un.season DESC, c.categoryName
+    """),
+
+    # UserNomination is partitioned by season: every /top_nominated
+    # statement filters on one, so it only reads that partition.
+    "top_nominated_seasons": Statement(
+        "SELECT DISTINCT season FROM UserNomination ORDER BY season DESC"
+    ),
+    "top_nominated_categories": Statement("""
+        SELECT c.categoryId, c.categoryName
+        FROM Category AS c
+        WHERE EXISTS (
+          SELECT 1 FROM UserNomination AS un
+          WHERE un.season     = %s
+            AND un.categoryId = c.categoryId
+        )
+        ORDER BY c.categoryName
+    """),
+    "top_nominated_years": Statement("""
+        SELECT DISTINCT releaseYear
+        FROM UserNomination
+        WHERE season = %s
+        ORDER BY releaseYear DESC
+    """),
+    "top_nominated_by_category": Statement("""
+        SELECT m.title, m.releaseDate, t.nomination_count
+        FROM (
+          SELECT movieId, COUNT(*) AS nomination_count
+          FROM UserNomination
+          WHERE season     = %s
+            AND categoryId = %s
+          GROUP BY movieId
+        ) AS t
+        JOIN Movie AS m ON m.movieId = t.movieId
+        ORDER BY t.nomination_count DESC
+    """),
+    "top_nominated_by_year": Statement("""
+        SELECT m.title, m.releaseDate, t.nomination_count
+        FROM (
+          SELECT movieId, COUNT(*) AS nomination_count
+          FROM UserNomination
+          WHERE season      = %s
+            AND releaseYear = %s
+          GROUP BY movieId
+        ) AS t
+        JOIN Movie AS m ON m.movieId = t.movieId
+        ORDER BY t.nomination_count DESC
+    """),
+
+    # /stats/<role>: "role" is a Role.statsRole, which groups categories.
+    "stats_roles": Statement(
+        "SELECT DISTINCT statsRole FROM Role WHERE statsRole IS NOT NULL ORDER BY statsRole",
+        ttl=REFERENCE_TTL
+    ),
+    "stats_role": Statement(
+        "SELECT 1 FROM Role WHERE statsRole = %s LIMIT 1",
+        ttl=REFERENCE_TTL
+    ),
+    "stats_persons": Statement("""
+        SELECT
+          p.personId,
+          CONCAT(p.firstName, ' ', p.lastName) AS person_label
+        FROM Person AS p
+        WHERE p.personId IN (
+          SELECT an.personId
+          FROM AcademyNomination AS an
+          JOIN Category AS c ON c.categoryId = an.categoryId
+          JOIN Role     AS r ON r.roleId     = c.roleId
+          WHERE r.statsRole = %s
+        )
+        ORDER BY p.lastName, p.firstName
+    """, ttl=REFERENCE_TTL, sqlite="""
+        SELECT
+          p.personId,
+          p.firstName || ' ' || p.lastName AS person_label
+        FROM Person AS p
+        WHERE p.personId IN (
+          SELECT an.personId
+          FROM AcademyNomination AS an
+          JOIN Category AS c ON c.categoryId = an.categoryId
+          JOIN Role     AS r ON r.roleId     = c.roleId
+          WHERE r.statsRole = ?
+        )
+        ORDER BY p.lastName, p.firstName
+    """),
+    "stats_totals": Statement("""
+        SELECT
+          COUNT(*)                   AS nominations,
+          SUM(an.grantedOrNot = 1)   AS wins
+        FROM AcademyNomination AS an
+        JOIN Category AS c ON c.categoryId = an.categoryId
+        JOIN Role     AS r ON r.roleId     = c.roleId
+        WHERE an.personId = %s
+          AND r.statsRole = %s
+    """, ttl=REFERENCE_TTL),
+    "stats_nominations": Statement("""
+        SELECT
+          an.movieTitle,
+          an.movieReleaseDate,
+          c.categoryName,
+          an.grantedOrNot
+        FROM AcademyNomination AS an
+        JOIN Category AS c ON c.categoryId = an.categoryId
+        JOIN Role     AS r ON r.roleId     = c.roleId
+        WHERE an.personId = %s
+          AND r.statsRole = %s
+        ORDER BY an.movieReleaseDate DESC, an.movieTitle
+    """, ttl=REFERENCE_TTL),
+
+    # Leaderboards read from the summary tables (migration 0006) that
+    # ingest.refresh_summaries rebuilds on every import.
+    "top_actor_country_wins": Statement("""
+        SELECT countryName, wins
+        FROM CountryGroupTotals
+        WHERE groupName = %s
+          AND wins > 0
+        ORDER BY wins DESC
+        LIMIT 5
+    """, bound=[BEST_ACTOR_GROUP], ttl=REFERENCE_TTL),
+    "top_actor_country_nominations": Statement("""
+        SELECT countryName, nominations
+        FROM CountryGroupTotals
+        WHERE groupName = %s
+        ORDER BY nominations DESC
+        LIMIT 5
+    """, bound=[BEST_ACTOR_GROUP], ttl=REFERENCE_TTL),
+
+    "birth_countries": Statement("""
+        SELECT co.countryId, co.countryName
+        FROM Country AS co
+        WHERE EXISTS (
+          SELECT 1 FROM Person AS p
+          WHERE p.countryOfBirthId = co.countryId
+        )
+        ORDER BY co.countryName
+    """, ttl=REFERENCE_TTL),
+    "staff_by_country": Statement("""
+        SELECT
+          p.firstName,
+          p.lastName,
+          c.categoryName,
+          COUNT(*)                   AS nomination_count,
+          SUM(an.grantedOrNot = 1)   AS win_count
+        FROM AcademyNomination AS an
+        JOIN Person   AS p ON p.personId   = an.personId
+        JOIN Category AS c ON c.categoryId = an.categoryId
+        WHERE p.countryOfBirthId = %s
+        GROUP BY
+          p.personId, an.categoryId
+        ORDER BY
+          win_count DESC,
+          nomination_count DESC
+    """, ttl=REFERENCE_TTL),
+
+    "top_companies": Statement("""
+        SELECT companyName, wins AS oscar_wins
+        FROM CompanyWins
+        ORDER BY wins DESC
+        LIMIT 5
+    """, ttl=REFERENCE_TTL),
+
+    "non_english_winners": Statement("""
+        SELECT title, year, languageName
+        FROM NonEnglishWinner
+        ORDER BY year DESC, title
+    """, ttl=REFERENCE_TTL),
+
+    # Living winners of every role ranked in one pass (leaderboard.py).
+    # RANK() keeps ties: everyone level with the k-th place is included.
+    # Roles with no living winner come back once, with NULL columns.
+    "role_leaderboard": Statement("""
+        SELECT
+          r.roleName,
+          ranked.place,
+          ranked.personId,
+          ranked.firstName,
+          ranked.lastName,
+          ranked.wins
+        FROM Role AS r
+        LEFT JOIN (
+          SELECT
+            c.roleId,
+            p.personId,
+            p.firstName,
+            p.lastName,
+            COUNT(*) AS wins,
+            RANK() OVER (PARTITION BY c.roleId ORDER BY COUNT(*) DESC) AS place
+          FROM AcademyNomination AS an
+          JOIN Category AS c ON c.categoryId = an.categoryId
+          JOIN Person   AS p ON p.personId   = an.personId
+          WHERE an.grantedOrNot = 1
+            AND p.deathDate IS NULL
+          GROUP BY c.roleId, p.personId
+        ) AS ranked
+          ON ranked.roleId = r.roleId
+         AND ranked.place <= %s
+        ORDER BY r.roleId, ranked.place, ranked.lastName, ranked.firstName
+    """, ttl=REFERENCE_TTL),
+}
+
+
+def _cursor(conn, name):
+    """
+    The prepared cursor for ``name`` on this physical connection. The
+    cache lives on the raw connection so it survives pool checkouts, and
+    is dropped when the connection id changes (i.e. after a reconnect).
+    """
+    raw = raw_connection(conn)
+    cache = getattr(raw, "_oscars_prepared", None)
+    if cache is None or cache[0] != raw.connection_id:
+        cache = (raw.connection_id, {})
+        raw._oscars_prepared = cache
+    cursors = cache[1]
+    if name not in cursors:
+        cursors[name] = raw.cursor(prepared=True)
+    return cursors[name]
+
+
+def _run(name, params, conn):
+    stmt = STATEMENTS[name]
+    if conn is None:
+        conn = get_db(readonly=stmt.readonly)
+    apply_budget(conn)
+    cur = _cursor(conn, name)
+    guard.record(name, stmt.sql)
+    start = time.perf_counter()
+    with profiler.sql_span(name):
+        cur.execute(stmt.sql, params + stmt.bound)
+        rows = cur.fetchall()
+    metrics.observe_query(name, time.perf_counter() - start, len(rows))
+    return rows
+
+
+def _run_reference(name, params, conn):
+    """A reference statement, on the embedded backend when it is enabled."""
+    if analytics.ENABLED:
+        rows = analytics.run(name, STATEMENTS[name], params)
+        if rows is not None:
+            return rows
+    return _run(name, params, conn)
+
+
+def fetchall(name, params=(), conn=None):
+    stmt = STATEMENTS[name]
+    params = tuple(params)
+    if not params and name in snapshot.TABLES:
+        table = snapshot.table(name)
+        if table is not None:
+            metrics.inc("snapshot_reads_total", statement=name)
+            return table
+    if stmt.ttl:
+        return list(cache.fetch(
+            name, params, stmt.ttl, lambda: _run_reference(name, params, conn)
+        ))
+    return _run(name, params, conn)
+
+
+def fetchone(name, params=(), conn=None):
+    # Prepared cursors must be drained before they run again, so this
+    # reads the whole (single-row) result rather than calling fetchone().
+    rows = fetchall(name, params, conn)
+    return rows[0] if rows else None
+
+
+def execute(name, params=(), conn=None):
+    """Run a write statement on the primary; the caller commits."""
+    stmt = STATEMENTS[name]
+    if conn is None:
+        conn = get_db()
+    cur = _cursor(conn, name)
+    guard.record(name, stmt.sql)
+    start = time.perf_counter()
+    with profiler.sql_span(name):
+        cur.execute(stmt.sql, tuple(params) + stmt.bound)
+    metrics.observe_query(name, time.perf_counter() - start, 0)
+    return cur.rowcount
@@ -0,0 +1,141 @@
+"""
+Voting seasons and the UserNomination partitions that hold them.
+
+A season is the ceremony year a vote counts towards: votes cast after
+that year's ceremony (CEREMONY_MONTH) count towards the next one.
+Partition pNNNN holds season NNNN, pold every season before the first
+live one, and pmax anything newer than the last pNNNN, so add the next
+season before it starts to keep pmax empty. archive and drop only touch
+a partition that holds exactly one season.
+
+    python seasons.py list
+    python seasons.py add SEASON       # split SEASON out of pmax
+    python seasons.py archive SEASON   # copy into UserNominationArchive, then drop
+    python seasons.py drop SEASON      # drop without keeping a copy
+
+Dropping a partition is a metadata change, however many votes it holds.
+"""
+import os
+import sys
+import datetime
+from db import get_db
+
+CEREMONY_MONTH = int(os.getenv("CEREMONY_MONTH", 3))
+# Pin the season the app votes into, e.g. while a ceremony runs late.
+SEASON_OVERRIDE = os.getenv("CURRENT_SEASON")
+
+ARCHIVE_TABLE = "UserNominationArchive"
+
+# Every stored column; releaseYear is generated and cannot be copied.
+COLUMNS = (
+    "userUsername, season, categoryId, personId, movieId, nominatedAt, "
+    "personFirstName, personLastName, personBirthDate, "
+    "movieTitle, movieReleaseDate, category, iteration, grantedOrNot"
+)
+
+
+def current_season(today=None):
+    if SEASON_OVERRIDE:
+        return int(SEASON_OVERRIDE)
+    today = today or datetime.date.today()
+    return today.year + (1 if today.month > CEREMONY_MONTH else 0)
+
+
+def partitions(cur):
+    """[(name, upper bound)] of UserNomination, in order."""
+    cur.execute("""
+        SELECT DISTINCT PARTITION_NAME, PARTITION_DESCRIPTION, PARTITION_ORDINAL_POSITION
+        FROM information_schema.PARTITIONS
+        WHERE TABLE_SCHEMA = DATABASE()
+          AND TABLE_NAME   = 'UserNomination'
+        ORDER BY PARTITION_ORDINAL_POSITION
+    """)
+    return [(name, bound) for name, bound, _ in cur.fetchall()]
+
+
+def _partition(cur, season):
+    """The name of ``season``'s partition, if it holds that season alone."""
+    name = f"p{season}"
+    lower = None
+    for partition, bound in partitions(cur):
+        if partition == name:
+            break
+        lower = bound
+    else:
+        raise SystemExit(f"No partition {name}; see 'python seasons.py list'.")
+    if lower is None or bound == "MAXVALUE" or int(bound) - int(lower) != 1:
+        raise SystemExit(
+            f"{name} holds more than season {season} (from {lower} up to {bound}); "
+            "refusing to remove it."
+        )
+    return name
+
+
+def add(conn, season):
+    cur = conn.cursor()
+    cur.execute(f"""
+        ALTER TABLE UserNomination
+        REORGANIZE PARTITION pmax INTO (
+          PARTITION p{season} VALUES LESS THAN ({season + 1}),
+          PARTITION pmax VALUES LESS THAN MAXVALUE
+        )
+    """)
+    cur.close()
+    print(f"Added partition p{season}")
+
+
+def archive(conn, season):
+    cur = conn.cursor()
+    name = _partition(cur, season)
+    cur.execute("SHOW TABLES LIKE %s", (ARCHIVE_TABLE,))
+    if not cur.fetchall():
+        cur.execute(f"CREATE TABLE {ARCHIVE_TABLE} LIKE UserNomination")
+        cur.execute(f"ALTER TABLE {ARCHIVE_TABLE} REMOVE PARTITIONING")
+    cur.execute(f"""
+        INSERT INTO {ARCHIVE_TABLE} ({COLUMNS})
+        SELECT {COLUMNS} FROM UserNomination PARTITION ({name})
+    """)
+    copied = cur.rowcount
+    conn.commit()
+    cur.execute(f"ALTER TABLE UserNomination DROP PARTITION {name}")
+    cur.close()
+    print(f"Archived {copied} nominations from {name} into {ARCHIVE_TABLE}")
+
+
+def drop(conn, season):
+    cur = conn.cursor()
+    name = _partition(cur, season)
+    cur.execute(f"ALTER TABLE UserNomination DROP PARTITION {name}")
+    cur.close()
+    print(f"Dropped {name}")
+
+
+def status(conn):
+    cur = conn.cursor()
+    for name, bound in partitions(cur):
+        print(f"{name:8} < {bound}")
+    cur.close()
+    print(f"Current season: {current_season()}")
+
+
+def main(argv):
+    commands = {"add": add, "archive": archive, "drop": drop}
+    if not argv or argv[0] not in ("list", *commands):
+        print(__doc__)
+        return 1
+    if argv[0] != "list" and (len(argv) < 2 or not argv[1].isdigit()):
+        print(f"Usage: python seasons.py {argv[0]} SEASON")
+        return 1
+    conn = get_db()
+    try:
+        if argv[0] == "list":
+            status(conn)
+        else:
+            commands[argv[0]](conn, int(argv[1]))
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,263 @@
+"""
+Read-only snapshot of the catalog tables, shared by every worker.
+
+    python snapshot.py        # write the snapshot for the current data
+
+The person, movie and category choice lists are written once per data
+version to SNAPSHOT_DIR/<version>.snap in a column-oriented layout:
+each column is a fixed-width array (integers, or indexes into one
+de-duplicated string table). Workers mmap the file and read the arrays
+through memoryviews, so there is no parsing at start-up and the page
+cache holds a single copy for all of them.
+
+queries.fetchall answers the statements stored here from the snapshot
+matching the live data version; without one it falls back to MySQL.
+ingest.py writes a new snapshot after each load.
+
+Layout (native byte order - the file is meant for the machine that
+wrote it):
+
+    b"OSCSNAP1" | uint32 header length | JSON header | sections...
+
+The header gives each table's row count and, per column, its kind
+("int" or "str"), array typecode and offset from the start of the
+sections. Every section starts on an 8-byte boundary.
+"""
+import os
+import sys
+import json
+import mmap
+import array
+import struct
+import threading
+import cache
+
+MAGIC = b"OSCSNAP1"
+SNAPSHOT_DIR = os.getenv(
+    "SNAPSHOT_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "snapshots")
+)
+KEEP_SNAPSHOTS = 2
+NULL_STRING = 0xFFFFFFFF
+
+# Statements copied into the snapshot. Their columns must be integers or
+# strings (NULL allowed in string columns only).
+TABLES = [
+    "nominate_persons",
+    "nominate_movies",
+    "nominate_categories",
+]
+
+_lock = threading.Lock()
+_open = None   # the Snapshot for the current version, once mapped
+
+
+class Table:
+    """Rows of one stored statement, read straight from the mapping."""
+
+    def __init__(self, snap, spec):
+        self._snap = snap
+        self.rows = spec["rows"]
+        self._columns = []
+        for col in spec["columns"]:
+            view = snap.view(col["offset"], col["code"], self.rows)
+            self._columns.append((col["kind"], view))
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self.rows
+        if not 0 <= i < self.rows:
+            raise IndexError(i)
+        return tuple(
+            view[i] if kind == "int" else self._snap.string(view[i])
+            for kind, view in self._columns
+        )
+
+    def __iter__(self):
+        columns = [
+            view if kind == "int" else map(self._snap.string, view)
+            for kind, view in self._columns
+        ]
+        return zip(*columns)
+
+
+class Snapshot:
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buf = memoryview(self._mm)
+        if self._buf[:8] != MAGIC:
+            raise ValueError(f"{path} is not a snapshot")
+        (length,) = struct.unpack_from("=I", self._buf, 8)
+        self.header = json.loads(bytes(self._buf[12:12 + length]))
+        self._body = 12 + length + _padding(12 + length)
+        self.version = self.header["version"]
+        strings = self.header["strings"]
+        self._string_offsets = self.view(strings["offsets"], "Q", strings["count"] + 1)
+        self._string_data = strings["data"]
+        self.tables = {
+            name: Table(self, spec) for name, spec in self.header["tables"].items()
+        }
+
+    def view(self, offset, code, count):
+        start = self._body + offset
+        size = array.array(code).itemsize
+        return self._buf[start:start + size * count].cast(code)
+
+    def string(self, i):
+        if i == NULL_STRING:
+            return None
+        start = self._body + self._string_data + self._string_offsets[i]
+        end = self._body + self._string_data + self._string_offsets[i + 1]
+        return str(self._buf[start:end], "utf-8")
+
+
+def _path(version):
+    return os.path.join(SNAPSHOT_DIR, f"{version}.snap")
+
+
+def current():
+    """The mapped snapshot for the live data version, or None."""
+    global _open
+    version = cache.data_version()
+    if version is None:
+        return None
+    snap = _open
+    if snap is not None and snap.version == version:
+        return snap
+    with _lock:
+        if _open is None or _open.version != version:
+            try:
+                _open = Snapshot(_path(version))
+            except (OSError, ValueError):
+                return None
+        # The old mapping stays valid for anyone still reading it and is
+        # unmapped once the last Table referencing it goes away.
+        return _open
+
+
+def table(name):
+    snap = current()
+    return snap.tables.get(name) if snap is not None else None
+
+
+# ---- build -----------------------------------------------------------------
+
+def _int_code(values):
+    low, high = min(values, default=0), max(values, default=0)
+    if -2**31 <= low and high < 2**31:
+        return "i"
+    return "q"
+
+
+def _encode(rows, strings):
+    """Turn rows into [(kind, typecode, bytes)] columns."""
+    columns = list(zip(*rows)) if rows else []
+    encoded = []
+    for values in columns:
+        if all(v is None or isinstance(v, str) for v in values):
+            idx = array.array("I", (
+                NULL_STRING if v is None else strings.setdefault(v, len(strings))
+                for v in values
+            ))
+            encoded.append(("str", "I", idx.tobytes()))
+        elif all(isinstance(v, int) for v in values):
+            code = _int_code(values)
+            encoded.append(("int", code, array.array(code, values).tobytes()))
+        else:
+            raise TypeError("snapshot columns must be all int or all str")
+    return encoded
+
+
+def _padding(size):
+    return -size % 8
+
+
+def _pad(out):
+    out.extend(b"\0" * _padding(len(out)))
+
+
+def write(path, version, results):
+    """Write ``results`` ({name: rows}) as a snapshot file at ``path``."""
+    strings = {}
+    encoded = {name: _encode(rows, strings) for name, rows in results.items()}
+
+    body = bytearray()
+    tables = {}
+    for name, columns in encoded.items():
+        specs = []
+        for kind, code, data in columns:
+            _pad(body)
+            specs.append({"kind": kind, "code": code, "offset": len(body)})
+            body.extend(data)
+        tables[name] = {"rows": len(results[name]), "columns": specs}
+
+    blobs = [s.encode("utf-8") for s in strings]   # insertion order = index
+    offsets = array.array("Q", [0])
+    for blob in blobs:
+        offsets.append(offsets[-1] + len(blob))
+    _pad(body)
+    strings_at = len(body)
+    body.extend(offsets.tobytes())
+    data_at = len(body)
+    body.extend(b"".join(blobs))
+
+    raw = json.dumps({
+        "version": version,
+        "tables": tables,
+        "strings": {"count": len(blobs), "offsets": strings_at, "data": data_at},
+    }).encode()
+    head = MAGIC + struct.pack("=I", len(raw)) + raw
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(head + b"\0" * _padding(len(head)))
+        f.write(body)
+    os.replace(tmp, path)
+
+
+def build():
+    """Snapshot the current data version; returns its path."""
+    from db import get_db
+    import queries
+
+    conn = get_db()
+    try:
+        cur = conn.cursor()
+        cur.execute("SELECT version FROM DataVersion WHERE id = 1")
+        (version,) = cur.fetchone()
+        results = {}
+        for name in TABLES:
+            stmt = queries.STATEMENTS[name]
+            cur.execute(stmt.sql, stmt.bound)
+            results[name] = cur.fetchall()
+        cur.close()
+    finally:
+        conn.close()
+
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    path = _path(version)
+    write(path, version, results)
+    _prune(version)
+    return path
+
+
+def _prune(current_version):
+    versions = sorted(
+        int(name[:-5]) for name in os.listdir(SNAPSHOT_DIR)
+        if name.endswith(".snap") and name[:-5].isdigit()
+    )
+    for version in versions[:-KEEP_SNAPSHOTS]:
+        if version != current_version:
+            os.remove(_path(version))
+
+
+def main():
+    print(f"Wrote {build()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+import os
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import request, g, abort, make_response, get_flashed_messages
+import mysql.connector
+import db
+
+# How many rendered analytics pages each worker keeps as a fallback.
+MAX_ENTRIES = int(os.getenv("STALE_MAX_ENTRIES", 256))
+
+# base.html leaves this marker where the stale banner goes.
+NOTICE_MARKER = b"<!-- stale-notice -->"
+
+_last_good = OrderedDict()
+
+
+def _key():
+    return (
+        request.path,
+        request.method,
+        tuple(sorted(request.args.items())),
+        tuple(sorted(request.form.items())),
+    )
+
+
+def _remember(key, response):
+    _last_good[key] = (response.get_data(), time.time())
+    _last_good.move_to_end(key)
+    while len(_last_good) > MAX_ENTRIES:
+        _last_good.popitem(last=False)
+
+
+def _stale_response(key):
+    body, saved_at = _last_good[key]
+    when = time.strftime("%Y-%m-%d %H:%M", time.localtime(saved_at))
+    notice = (
+        '<div class="alert alert-warning" role="alert">'
+        f"The database is slow right now; showing results from {when}."
+        "</div>"
+    ).encode()
+    response = make_response(body.replace(NOTICE_MARKER, notice, 1))
+    response.headers["Warning"] = '110 - "Response is Stale"'
+    response.headers["X-Stale"] = "1"
+    return response
+
+
+def serve_stale(view):
+    """
+    Remember the last successful page for each path and form input. When
+    the circuit breaker is open or a query runs past its budget, serve
+    that page with a stale banner instead of an error; with nothing to
+    fall back on, answer 503.
+    """
+    @wraps(view)
+    def wrapped(**kwargs):
+        key = _key()
+        try:
+            response = make_response(view(**kwargs))
+        except mysql.connector.Error as err:
+            if isinstance(err, db.DatabaseUnavailable):
+                pass
+            elif db.is_timeout(err):
+                db.breaker.record_failure()
+                g.db_failed = True
+            else:
+                raise
+            if key not in _last_good:
+                abort(503)
+            return _stale_response(key)
+
+        # Pages that flashed a validation message are not worth replaying.
+        if response.status_code == 200 and not get_flashed_messages():
+            _remember(key, response)
+        return response
+    return wrapped
@@ -0,0 +1,102 @@
+"""
+Typeahead for persons and movies, answered from memory.
+
+    /api/suggest/person?q=hanks&limit=10 -> [{"id": 12, "label": "Tom Hanks (...)"}, ...]
+    /api/suggest/movie?q=god
+
+Each index is a sorted list of case- and accent-folded keys: the whole
+label plus the rest of it from every word onwards, so "hanks" and
+"tom h" both find Tom Hanks. A lookup bisects to the first key with the
+query as prefix and walks forward until it has ``limit`` distinct
+entries, which takes microseconds. The indexes are built from the
+/nominate choice lists (the snapshot, or MySQL without one) on first use
+and again whenever the data version moves. Like the lists, the endpoint
+needs a login.
+"""
+import os
+import bisect
+import threading
+import unicodedata
+from flask import request, jsonify, abort
+import cache
+import queries
+
+DEFAULT_LIMIT = int(os.getenv("SUGGEST_LIMIT", 10))
+MAX_LIMIT = 50
+
+# kind -> statement with (id, label) rows
+SOURCES = {
+    "person": "nominate_persons",
+    "movie": "nominate_movies",
+}
+
+_lock = threading.Lock()
+_indexes = {}   # kind -> _Index
+
+
+def fold(text):
+    """Lower-case ``text`` and drop accents, for matching."""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+class _Index:
+    def __init__(self, version, rows):
+        self.version = version
+        self.ids = []
+        self.labels = []
+        entries = []
+        for key, label in rows:
+            if not label:
+                continue
+            n = len(self.ids)
+            self.ids.append(key)
+            self.labels.append(label)
+            words = fold(label).split()
+            for i in range(len(words)):
+                entries.append((" ".join(words[i:]), n))
+        entries.sort()
+        self.keys = [key for key, _ in entries]
+        self.entries = [n for _, n in entries]
+
+    def search(self, query, limit):
+        prefix = " ".join(fold(query).split())
+        if not prefix:
+            return []
+        found = []
+        seen = set()
+        i = bisect.bisect_left(self.keys, prefix)
+        while i < len(self.keys) and len(found) < limit:
+            if not self.keys[i].startswith(prefix):
+                break
+            n = self.entries[i]
+            if n not in seen:
+                seen.add(n)
+                found.append({"id": self.ids[n], "label": self.labels[n]})
+            i += 1
+        return found
+
+
+def index(kind):
+    """The index for ``kind`` at the live data version."""
+    version = cache.data_version()
+    idx = _indexes.get(kind)
+    if idx is not None and idx.version == version:
+        return idx
+    with _lock:
+        idx = _indexes.get(kind)
+        if idx is None or idx.version != version:
+            idx = _indexes[kind] = _Index(version, queries.fetchall(SOURCES[kind]))
+        return idx
+
+
+def _view(kind):
+    if kind not in SOURCES:
+        abort(404)
+    limit = request.args.get("limit", DEFAULT_LIMIT, type=int)
+    limit = max(1, min(limit, MAX_LIMIT))
+    return jsonify(index(kind).search(request.args.get("q", ""), limit))
+
+
+def init_app(app, login_required):
+    app.add_url_rule("/api/suggest/<kind>", "suggest", login_required(_view))
@@ -0,0 +1,147 @@
+import os
+import time
+import datetime
+import threading
+from decimal import Decimal
+import pytest
+import cache
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch, tmp_path):
+    monkeypatch.setattr(cache, "_read_version", lambda: (1, None))
+    monkeypatch.setattr(cache, "ENABLED", True)
+    monkeypatch.setattr(cache, "XFETCH_BETA", 0)
+    monkeypatch.setattr(cache, "SINGLEFLIGHT_DIR", str(tmp_path / "singleflight"))
+    monkeypatch.setattr(cache, "_shared_ok", None)
+    monkeypatch.setattr(cache, "_version", None)
+    monkeypatch.setattr(cache, "_polled_at", 0.0)
+    cache.clear()
+    yield
+    cache.clear()
+
+
+class Counting:
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.rows
+
+
+def test_hit_skips_compute():
+    compute = Counting([(1, "a")])
+    assert cache.fetch("s", (), 60, compute) == [(1, "a")]
+    assert cache.fetch("s", (), 60, compute) == [(1, "a")]
+    assert compute.calls == 1
+
+
+def test_least_recently_used_is_evicted(monkeypatch):
+    monkeypatch.setattr(cache, "fcntl", None)   # no results from other workers
+    monkeypatch.setattr(cache, "MAX_ENTRIES", 2)
+    a, b, c = Counting([(1,)]), Counting([(2,)]), Counting([(3,)])
+    cache.fetch("a", (), 60, a)
+    cache.fetch("b", (), 60, b)
+    cache.fetch("a", (), 60, a)       # a is now the most recent
+    cache.fetch("c", (), 60, c)
+    assert set(cache._entries) == {("a", ()), ("c", ())}
+    cache.fetch("a", (), 60, a)
+    assert a.calls == 1
+    cache.fetch("b", (), 60, b)
+    assert b.calls == 2
+
+
+def test_byte_cap_evicts_oldest(monkeypatch):
+    rows = [(i, "x" * 100) for i in range(10)]
+    monkeypatch.setattr(cache, "MAX_BYTES", int(cache._sizeof(rows) * 2.5))
+    for name in ("a", "b", "c"):
+        cache.fetch(name, (), 60, Counting(rows))
+    assert list(cache._entries) == [("b", ()), ("c", ())]
+    assert cache._bytes <= cache.MAX_BYTES
+
+
+def test_result_larger_than_cap_is_not_kept(monkeypatch):
+    monkeypatch.setattr(cache, "fcntl", None)
+    monkeypatch.setattr(cache, "MAX_BYTES", 100)
+    compute = Counting([(i,) for i in range(100)])
+    cache.fetch("big", (), 60, compute)
+    cache.fetch("big", (), 60, compute)
+    assert compute.calls == 2
+    assert cache._bytes == 0
+
+
+def test_entry_expires_after_ttl(monkeypatch):
+    compute = Counting([(1,)])
+    cache.fetch("s", (), 0.05, compute)
+    time.sleep(0.1)
+    cache.fetch("s", (), 0.05, compute)
+    assert compute.calls == 2
+
+
+def test_concurrent_misses_compute_once():
+    release = threading.Event()
+    compute = Counting([(1,)])
+
+    def slow():
+        release.wait(5)
+        return compute()
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.fetch("s", (), 60, slow)))
+        for _ in range(5)
+    ]
+    for t in threads:
+        t.start()
+    time.sleep(0.1)
+    release.set()
+    for t in threads:
+        t.join()
+    assert results == [[(1,)]] * 5
+    assert compute.calls == 1
+
+
+@pytest.mark.skipif(cache.fcntl is None, reason="needs fcntl")
+def test_other_worker_reads_shared_result():
+    rows = [(1, "Tom Hanks", datetime.date(1956, 7, 9), Decimal("7.5"), None)]
+    cache.fetch("s", (), 60, Counting(rows))
+    cache.clear()                       # another worker's empty cache
+    compute = Counting([])
+    assert cache.fetch("s", (), 60, compute) == rows
+    assert compute.calls == 0
+
+
+@pytest.mark.skipif(cache.fcntl is None, reason="needs fcntl")
+def test_shared_dir_must_be_private():
+    os.makedirs(cache.SINGLEFLIGHT_DIR, mode=0o755)
+    os.chmod(cache.SINGLEFLIGHT_DIR, 0o755)
+    assert not cache._shared_dir()
+
+
+def test_rows_from_before_a_version_bump_are_dropped(monkeypatch):
+    version = [1]
+    monkeypatch.setattr(cache, "_read_version", lambda: (version[0], None))
+    monkeypatch.setattr(cache, "POLL_SECONDS", 0)
+
+    def racing():
+        version[0] = 2
+        cache.data_version()            # an import lands mid-computation
+        return [("old",)]
+
+    assert cache.fetch("s", (), 60, racing) == [("old",)]
+    assert cache._entries == {}
+    assert cache.fetch("s", (), 60, Counting([("new",)])) == [("new",)]
+
+
+def test_version_never_moves_backwards(monkeypatch):
+    versions = iter([5, 5, 4, 6])
+    monkeypatch.setattr(cache, "_read_version", lambda: (next(versions), None))
+    monkeypatch.setattr(cache, "POLL_SECONDS", 0)
+    assert cache.data_version() == 5
+    cache.fetch("s", (), 60, Counting([(1,)]))
+    assert cache.data_version() == 5    # a lagging replica answered
+    assert ("s", ()) in cache._entries
+    assert cache.data_version() == 6
+    assert cache._entries == {}
@@ -0,0 +1,49 @@
+import gzip
+import pytest
+from flask import Flask, Response
+import compress
+from compress import CompressMiddleware
+
+CHUNKS = [f"<tr><td>{i}</td><td>row {i}</td></tr>\n".encode() for i in range(500)]
+
+
+def client(body, mimetype="text/html"):
+    app = Flask(__name__)
+
+    @app.route("/")
+    def page():
+        return Response(iter(body), mimetype=mimetype)
+
+    app.wsgi_app = CompressMiddleware(app.wsgi_app)
+    return app.test_client()
+
+
+def test_streamed_gzip_body_decompresses_to_original():
+    response = client(CHUNKS).get("/", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert gzip.decompress(response.get_data()) == b"".join(CHUNKS)
+
+
+def test_small_body_is_left_alone():
+    response = client([b"<p>hi</p>"]).get("/", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in response.headers
+    assert response.get_data() == b"<p>hi</p>"
+
+
+def test_binary_body_is_left_alone():
+    response = client(CHUNKS, "image/png").get("/", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in response.headers
+
+
+def test_without_accept_encoding():
+    response = client(CHUNKS).get("/", headers={"Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in response.headers
+    assert response.get_data() == b"".join(CHUNKS)
+
+
+@pytest.mark.skipif(compress.brotli is None, reason="needs brotli")
+def test_brotli_preferred_when_installed():
+    response = client(CHUNKS).get("/", headers={"Accept-Encoding": "gzip, br"})
+    assert response.headers["Content-Encoding"] == "br"
+    assert compress.brotli.decompress(response.get_data()) == b"".join(CHUNKS)
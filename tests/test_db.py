@@ -0,0 +1,47 @@
+from flask import Flask, g
+import db
+import queries
+
+
+class FakeCursor:
+    def __init__(self, log):
+        self.log = log
+
+    def execute(self, sql, params=()):
+        self.log.append((sql, params))
+
+    def fetchall(self):
+        return []
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    connection_id = 1
+
+    def __init__(self):
+        self.log = []
+
+    def cursor(self, **kwargs):
+        return FakeCursor(self.log)
+
+
+def test_route_budget_applies_to_a_connection_checked_out_earlier():
+    conn = FakeConnection()
+    conn._oscars_budget = (1, 0)        # checked out before the view set a budget
+    app = Flask(__name__)
+    with app.test_request_context():
+        g.query_budget_ms = 500
+        queries.fetchall("user_nominations", ("alice",), conn)
+        queries.fetchall("user_nominations", ("bob",), conn)
+    budgets = [params for sql, params in conn.log if "MAX_EXECUTION_TIME" in sql]
+    assert budgets == [(500,)]
+
+
+def test_budget_is_lifted_for_a_view_without_one():
+    conn = FakeConnection()
+    conn._oscars_budget = (1, 500)      # left by the previous request
+    with Flask(__name__).test_request_context():
+        db.apply_budget(conn)
+    assert conn.log == [("SET SESSION MAX_EXECUTION_TIME = %s", (0,))]
@@ -0,0 +1,48 @@
+import pytest
+from flask import Flask
+import guard
+import queries
+from guard import max_queries, QueryBudgetExceeded
+
+
+@pytest.fixture
+def client(monkeypatch):
+    def run(name, params, conn):
+        guard.record(name, queries.STATEMENTS[name].sql)
+        return [("2025", "Best Picture", "Oppenheimer")]
+
+    monkeypatch.setattr(queries, "_run", run)
+
+    app = Flask(__name__)
+    app.testing = True
+    guard.init_app(app)
+
+    @app.route("/within")
+    @max_queries(2)
+    def within():
+        queries.fetchall("user_nominations", ("alice",))
+        queries.fetchall("user_nominations", ("bob",))
+        return "ok"
+
+    @app.route("/over")
+    @max_queries(1)
+    def over():
+        queries.fetchall("user_nominations", ("alice",))
+        queries.fetchall("user_nominations", ("bob",))
+        return "ok"
+
+    return app.test_client()
+
+
+def test_within_budget_passes(client):
+    assert client.get("/within").data == b"ok"
+
+
+def test_over_budget_raises(client):
+    with pytest.raises(QueryBudgetExceeded, match="ran 2 queries, budget is 1"):
+        client.get("/over")
+
+
+def test_shape_ignores_literals_and_in_lists():
+    assert guard.shape("SELECT 1 FROM t WHERE a IN (%s, %s) AND b = 'x'") == \
+        guard.shape("SELECT 2 FROM t WHERE a IN (%s) AND b = 'y'")
@@ -0,0 +1,136 @@
+"""
+Every route of the real app, GET and POST, against canned rows, so a
+view that runs more statements than its ``@max_queries(n)`` fails here
+(guard.py raises QueryBudgetExceeded under app.testing).
+"""
+import datetime
+import pytest
+import app as oscars
+import cache
+import choices
+import db
+import fragments
+import guard
+import queries
+import snapshot
+
+BIG = datetime.date(1988, 6, 3)
+
+# Canned rows for every SELECT in queries.py, by statement name.
+ROWS = {
+    "movie_count": [(42,)],
+    "user_taken": [],
+    "user_exists": [("alice",)],
+    "nominate_persons": [(1, "Tom Hanks (1956-07-09)")],
+    "nominate_movies": [(1, "Big (1988-06-03)")],
+    "nominate_categories": [(1, "Best Actor")],
+    "user_nominations": [(2025, "Best Actor", "Big", "Tom Hanks")],
+    "top_nominated_seasons": [(2025,)],
+    "top_nominated_categories": [(1, "Best Actor")],
+    "top_nominated_years": [(1988,)],
+    "top_nominated_by_category": [("Big", BIG, 3)],
+    "top_nominated_by_year": [("Big", BIG, 3)],
+    "stats_roles": [("actor",)],
+    "stats_role": [(1,)],
+    "stats_persons": [(1, "Tom Hanks")],
+    "stats_totals": [(2, 1)],
+    "stats_nominations": [("Big", BIG, "Best Actor", 1)],
+    "top_actor_country_wins": [("United States", 3)],
+    "top_actor_country_nominations": [("United States", 9)],
+    "birth_countries": [(1, "United States")],
+    "staff_by_country": [("Tom", "Hanks", "Best Actor", 2, 1)],
+    "top_companies": [("Paramount", 7)],
+    "non_english_winners": [("Parasite", 2019, "Korean")],
+    "role_leaderboard": [("actor", 1, 1, "Tom", "Hanks", 2)],
+}
+
+ARGS = {"role": "actor", "kind": "person", "digest": "0", "filename": "logo.svg"}
+FORMS = {
+    "register": {"username": "bob", "email": "bob@example.com"},
+    "login": {"username": "alice"},
+    "nominate": {"person": "1", "movie": "1", "category": "1"},
+    "top_nominated": {"category": "1"},
+    "stats": {"person": "1"},
+    "staff_by_country": {"country": "1"},
+}
+SKIP = {"static", "readyz"}
+
+
+class FakeConnection:
+    in_transaction = False
+    connection_id = 1
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def requests():
+    params = []
+    for rule in oscars.app.url_map.iter_rules():
+        if rule.endpoint in SKIP:
+            continue
+        url = rule.build({arg: ARGS[arg] for arg in rule.arguments})[1]
+        for method in ("GET", "POST"):
+            if method in rule.methods:
+                params.append(pytest.param(method, url, FORMS.get(rule.endpoint),
+                                           id=f"{method} {rule.rule}"))
+    return params
+
+
+@pytest.fixture
+def client(monkeypatch):
+    statements = []
+
+    def run(name, params, conn):
+        guard.record(name, queries.STATEMENTS[name].sql)
+        statements.append(name)
+        return list(ROWS[name])
+
+    def execute(name, params=(), conn=None):
+        guard.record(name, queries.STATEMENTS[name].sql)
+        statements.append(name)
+        return 1
+
+    monkeypatch.setattr(queries, "_run", run)
+    monkeypatch.setattr(queries, "execute", execute)
+    monkeypatch.setattr(db, "_checkout", lambda *args: FakeConnection())
+    monkeypatch.setattr(cache, "_read_version", lambda: (1, None))
+    # Count every statement a request needs, not what earlier ones cached.
+    monkeypatch.setattr(cache, "ENABLED", False)
+    monkeypatch.setattr(fragments, "ENABLED", False)
+    monkeypatch.setattr(snapshot, "table", lambda name: None)
+    monkeypatch.setattr(choices, "_bundle", None)
+    monkeypatch.setattr(oscars.app, "testing", True)
+
+    client = oscars.app.test_client()
+    with client.session_transaction() as s:
+        s["username"] = "alice"
+    client.statements = statements
+    return client
+
+
+def test_every_select_has_canned_rows():
+    selects = {
+        name for name, stmt in queries.STATEMENTS.items()
+        if stmt.sql.split(None, 1)[0].upper() == "SELECT"
+    }
+    assert selects == set(ROWS)
+
+
+@pytest.mark.parametrize("method, url, form", requests())
+def test_route_stays_within_its_query_budget(client, method, url, form):
+    response = client.open(url, method=method, data=form)
+    assert response.status_code < 500
+
+
+def test_stats_post_runs_its_statements(client):
+    client.post("/stats/actor", data={"person": "1"})
+    assert client.statements == [
+        "stats_role", "stats_totals", "stats_nominations", "stats_persons"
+    ]
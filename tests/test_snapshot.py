@@ -0,0 +1,47 @@
+import pytest
+import snapshot
+
+
+def roundtrip(tmp_path, results):
+    path = str(tmp_path / "7.snap")
+    snapshot.write(path, 7, results)
+    snap = snapshot.Snapshot(path)
+    assert snap.version == 7
+    return {name: list(table) for name, table in snap.tables.items()}
+
+
+def test_roundtrip(tmp_path):
+    results = {
+        "persons": [(1, "Tom Hanks"), (2, None), (3, "Penélope Cruz")],
+        "movies": [(2**40, "千と千尋の神隠し"), (-5, "")],
+        "categories": [],
+    }
+    assert roundtrip(tmp_path, results) == results
+
+
+def test_strings_are_shared_between_tables(tmp_path):
+    results = {"a": [(1, "Drama")], "b": [(2, "Drama")]}
+    assert roundtrip(tmp_path, results) == results
+    assert snapshot.Snapshot(str(tmp_path / "7.snap")).header["strings"]["count"] == 1
+
+
+def test_table_indexing(tmp_path):
+    path = str(tmp_path / "7.snap")
+    snapshot.write(path, 7, {"t": [(1, "a"), (2, "b")]})
+    table = snapshot.Snapshot(path).tables["t"]
+    assert len(table) == 2
+    assert table[-1] == (2, "b")
+    with pytest.raises(IndexError):
+        table[2]
+
+
+def test_mixed_column_is_rejected(tmp_path):
+    with pytest.raises(TypeError):
+        snapshot.write(str(tmp_path / "7.snap"), 7, {"t": [(1,), ("a",)]})
+
+
+def test_not_a_snapshot(tmp_path):
+    path = tmp_path / "7.snap"
+    path.write_bytes(b"garbage!" + b"\0" * 8)
+    with pytest.raises(ValueError):
+        snapshot.Snapshot(str(path))
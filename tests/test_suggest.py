@@ -0,0 +1,41 @@
+from suggest import _Index, fold
+
+ROWS = [
+    (1, "Tom Hanks (1956-07-09)"),
+    (2, "Tom Holland (1996-06-01)"),
+    (3, "Colin Hanks (1977-11-24)"),
+    (4, "Penélope Cruz (1974-04-28)"),
+    (5, None),
+]
+
+
+def ids(results):
+    return [r["id"] for r in results]
+
+
+def test_matches_any_word():
+    assert sorted(ids(_Index(1, ROWS).search("hanks", 10))) == [1, 3]
+
+
+def test_matches_across_words():
+    index = _Index(1, ROWS)
+    assert sorted(ids(index.search("tom h", 10))) == [1, 2]
+    assert ids(index.search("tom ha", 10)) == [1]
+
+
+def test_case_spacing_and_accents_are_ignored():
+    index = _Index(1, ROWS)
+    assert ids(index.search("  PENELOPE   cruz", 10)) == [4]
+    assert fold("Pénélope") == "penelope"
+
+
+def test_limit_and_empty_query():
+    index = _Index(1, ROWS)
+    assert len(index.search("tom", 1)) == 1
+    assert index.search("   ", 10) == []
+    assert index.search("zzz", 10) == []
+
+
+def test_each_entry_is_listed_once():
+    index = _Index(1, [(1, "Hanks Hanks")])
+    assert index.search("hanks", 10) == [{"id": 1, "label": "Hanks Hanks"}]
@@ -0,0 +1,96 @@
+"""
+Warm-up before a worker takes traffic, and the /readyz probe.
+
+gunicorn.conf.py runs the two halves:
+
+* in the master, before forking (``preload_app``): every template under
+  templates/ is compiled, going through a Jinja bytecode cache in
+  JINJA_CACHE_DIR so a restart with unchanged templates skips the
+  compile step, and the workers inherit the compiled templates;
+* in each worker, right after the fork: its connection pools are
+  opened, the snapshot is mapped and the reference data behind
+  /nominate, /stats and /staff_by_country is loaded into the caches.
+
+/readyz answers 503 until the worker's warm-up has succeeded, then 200.
+A warm-up that failed (MySQL not up yet, say) is retried by the next
+probe, at most every RETRY_SECONDS.
+"""
+import os
+import time
+import threading
+from jinja2 import FileSystemBytecodeCache
+from flask import jsonify, current_app
+
+JINJA_CACHE_DIR = os.getenv(
+    "JINJA_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "build", "jinja")
+)
+RETRY_SECONDS = float(os.getenv("WARMUP_RETRY_SECONDS", 5))
+
+_lock = threading.Lock()
+_ready = False
+_error = None
+_tried_at = 0.0
+
+
+def compile_templates(app):
+    """Load every template now; returns how many."""
+    names = app.jinja_env.list_templates(extensions=["html"])
+    for name in names:
+        app.jinja_env.get_template(name)
+    return len(names)
+
+
+def prime_data(app):
+    """Load the reference data the busiest views need."""
+    import db
+    import cache
+    import queries
+    import snapshot
+    import choices
+    import suggest
+
+    db.prime_pools()
+    with app.app_context():
+        cache.data_version()
+        snapshot.current()
+        choices.current()                       # /nominate
+        for kind in suggest.SOURCES:
+            suggest.index(kind)
+        for (role,) in queries.fetchall("stats_roles"):
+            queries.fetchone("stats_role", (role,))
+            queries.fetchall("stats_persons", (role,))
+        queries.fetchall("birth_countries")     # /staff_by_country
+
+
+def warm(app):
+    """Run this worker's warm-up; returns True once it has succeeded."""
+    global _ready, _error, _tried_at
+    with _lock:
+        if _ready:
+            return True
+        _tried_at = time.monotonic()
+        try:
+            compile_templates(app)
+            prime_data(app)
+        except Exception as e:
+            _error = f"{type(e).__name__}: {e}"
+            app.logger.warning("Warm-up failed: %s", _error)
+            return False
+        _ready, _error = True, None
+        return True
+
+
+def _readyz_view():
+    if (not _ready and time.monotonic() - _tried_at >= RETRY_SECONDS
+            and not _lock.locked()):
+        warm(current_app._get_current_object())
+    if _ready:
+        return jsonify(status="ready")
+    return jsonify(status="warming", error=_error), 503
+
+
+def init_app(app):
+    os.makedirs(JINJA_CACHE_DIR, exist_ok=True)
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(JINJA_CACHE_DIR)
+    app.add_url_rule("/readyz", "readyz", _readyz_view)